@@ -0,0 +1,112 @@
+"""开奖/预测列表读取路径基准测试
+
+对比 ORM 实例 + to_dict() 与 FastReads 轻量读取路径在不同 limit 下的耗时和逐行开销。
+测试在临时数据库副本上进行，可用 --rows 把开奖记录扩充到指定条数。
+
+用法: python scripts/benchmark_read_path.py [--rows 20000] [--repeat 20]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, g
+from src.models.user import db
+from src.models.database import init_sqlite, sqlite_binds
+from src.models.lottery import LotteryResult
+from src.services.fast_reads import FastReads
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'database', 'app.db')
+
+
+def build_database(path, rows):
+    """复制数据库，并以平移日期、改写期号的方式复制已有开奖，扩充到 rows 条"""
+    shutil.copyfile(SOURCE_DB, path)
+    connection = sqlite3.connect(path)
+    base = connection.execute("SELECT COUNT(*) FROM lottery_results").fetchone()[0]
+    if base == 0:
+        raise SystemExit('数据库中没有开奖记录，请先获取数据')
+    max_id = connection.execute("SELECT MAX(id) FROM lottery_results").fetchone()[0]
+    copy = 1
+    while connection.execute("SELECT COUNT(*) FROM lottery_results").fetchone()[0] < rows:
+        missing = rows - connection.execute("SELECT COUNT(*) FROM lottery_results").fetchone()[0]
+        connection.execute(
+            "INSERT INTO lottery_results (original_id, type, type_name, issue_number, lottery_date, week, "
+            "win_code, red_balls, blue_ball, created_at, updated_at) "
+            "SELECT original_id + ? * 10000000, type, type_name, issue_number || '-' || ?, "
+            "date(lottery_date, ?), week, win_code, red_balls, blue_ball, created_at, updated_at "
+            "FROM lottery_results WHERE id <= ? LIMIT ?",
+            (copy, copy, f'-{copy * 3 * 365} days', max_id, missing)
+        )
+        copy += 1
+    connection.commit()
+    connection.close()
+
+
+def create_app(path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_BINDS'] = sqlite_binds(app.config['SQLALCHEMY_DATABASE_URI'])
+    db.init_app(app)
+    init_sqlite(app, db)
+    return app
+
+
+def measure(function, repeat):
+    function()  # 预热（建立连接、编译语句）
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def orm_results(limit):
+    query = LotteryResult.query.order_by(LotteryResult.lottery_date.desc())
+    pagination = query.paginate(page=1, per_page=limit, error_out=False)
+    return [result.to_dict() for result in pagination.items]
+
+
+def fast_results(limit):
+    return FastReads.fetch_results(page=1, limit=limit)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000, help='开奖记录条数')
+    parser.add_argument('--repeat', type=int, default=20, help='每项重复次数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'benchmark.db')
+        build_database(path, args.rows)
+        app = create_app(path)
+
+        with app.test_request_context():
+            g.read_only = True
+            total = LotteryResult.query.count()
+
+            assert orm_results(20) == fast_results(20), '轻量读取路径的输出与 to_dict() 不一致'
+
+            print(f'开奖记录: {total} 条, 每项重复 {args.repeat} 次')
+            print(f"{'limit':>8} {'ORM(ms)':>10} {'轻量(ms)':>10} {'ORM(us/行)':>12} {'轻量(us/行)':>12} {'加速':>6}")
+            for limit in sorted({20, 100, 1000, total}):
+                if limit > total:
+                    continue
+                orm = measure(lambda: orm_results(limit), args.repeat)
+                fast = measure(lambda: fast_results(limit), args.repeat)
+                print(f'{limit:>8} {orm * 1000:>10.2f} {fast * 1000:>10.2f} '
+                      f'{orm / limit * 1e6:>12.2f} {fast / limit * 1e6:>12.2f} {orm / fast:>5.1f}x')
+
+            db.session.remove()
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,18 +3,27 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask, request
 from flask_cors import CORS
 from src.models.user import db
-from src.models.lottery import LotteryResult, NumberFrequency, PredictionResult
+from src.models.database import add_missing_columns, init_sqlite, rebuild_changed_tables, sqlite_binds
+from src.models.lottery import LotteryResult, NumberFrequency, PredictionResult, MarkovTransitionState, DrawFeature
 from src.routes.user import user_bp
 from src.routes.lottery import lottery_bp
+from src.services.feature_store import FeatureStore
+from src.services.decayed_frequency import DecayedFrequencyService
+from src.services.compression import init_compression
+from src.services.static_manifest import StaticManifest
+from src.services.scheduler import init_scheduler
+from src.services.lottery_types import LOTTERY_TYPES
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
 # 启用CORS支持
 CORS(app)
+# API 响应按大小压缩（gzip/brotli）
+init_compression(app)
 
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(lottery_bp, url_prefix='/api/lottery')
@@ -22,25 +31,41 @@ app.register_blueprint(lottery_bp, url_prefix='/api/lottery')
 # uncomment if you need to use database
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# 分析和列表接口使用独立的只读连接池（WAL 模式，入库时读请求不受阻塞）
+app.config['SQLALCHEMY_BINDS'] = sqlite_binds(app.config['SQLALCHEMY_DATABASE_URI'])
 db.init_app(app)
+init_sqlite(app, db)
 with app.app_context():
     db.create_all()
+    # 为已有表补齐新增的列和索引
+    add_missing_columns(db, LotteryResult, NumberFrequency, PredictionResult, MarkovTransitionState, DrawFeature)
+    # 唯一约束改为按彩种区分的表需要重建（SQLite 不支持修改约束）
+    rebuild_changed_tables(db, LotteryResult, MarkovTransitionState)
+    for lottery_type in LOTTERY_TYPES:
+        # 补齐历史开奖缺失的特征（只处理尚未计算的记录）
+        FeatureStore.sync_features(lottery_type)
+        # 衰减频率得分（已是最新时不做任何计算）
+        DecayedFrequencyService.sync_scores(lottery_type=lottery_type)
+
+# 按开奖日历自动同步数据（AUTO_SYNC=1 时开启）；debug 模式下只在重载后的子进程中启动，多进程部署时由文件锁保证只有一个进程运行
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    init_scheduler(app, os.path.join(os.path.dirname(__file__), 'database', 'scheduler.lock'))
+
+# 静态文件在启动时读入内存并预压缩，请求时只查清单
+static_manifest = StaticManifest.build(app.static_folder) if app.static_folder else None
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
+    if static_manifest is None:
+        return "Static folder not configured", 404
+
+    asset, immutable = static_manifest.lookup(path) if path != "" else (None, False)
+    if asset is None:
+        asset, immutable = static_manifest.lookup('index.html')
+        if asset is None:
             return "index.html not found", 404
+    return StaticManifest.make_response(asset, immutable, request)
 
 
 if __name__ == '__main__':
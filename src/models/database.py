@@ -0,0 +1,152 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import UniqueConstraint, event, inspect, text
+
+# 只读连接池的 bind 名称（与写连接指向同一个 SQLite 文件）
+READ_BIND = 'readonly'
+
+# 读写连接共用的 PRAGMA：WAL 模式下读不阻塞写、写不阻塞读
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',       # WAL 下 NORMAL 已能保证一致性，提交无需每次 fsync
+    'cache_size': -65536,          # 64MB 页缓存
+    'mmap_size': 268435456,        # 256MB 内存映射读取
+    'busy_timeout': 5000,          # 遇到写锁时最多等待5秒，而不是立即报 database is locked
+    'temp_store': 'MEMORY'
+}
+
+# 入库写操作在进程内串行执行
+_write_lock = threading.Lock()
+
+
+class RoutingSession(Session):
+    """按请求类型选择连接：标记为只读的请求走只读连接池，其余走写连接"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context() and g.get('read_only') and READ_BIND in self._db.engines:
+            return self._db.engines[READ_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _apply_pragmas(dbapi_connection, extra=None):
+    cursor = dbapi_connection.cursor()
+    for name, value in dict(SQLITE_PRAGMAS, **(extra or {})).items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def _on_write_connect(dbapi_connection, connection_record):
+    _apply_pragmas(dbapi_connection)
+
+
+def _on_read_connect(dbapi_connection, connection_record):
+    # 由 SQLAlchemy 显式发出 BEGIN，使一个请求内的多次查询读取同一个快照
+    dbapi_connection.isolation_level = None
+    _apply_pragmas(dbapi_connection, {'query_only': 'ON'})
+
+
+def _on_read_begin(connection):
+    connection.exec_driver_sql('BEGIN')
+
+
+def sqlite_binds(database_uri, pool_size=8):
+    """生成只读连接池的 SQLALCHEMY_BINDS 配置"""
+    return {
+        READ_BIND: {
+            'url': database_uri,
+            'pool_size': pool_size,
+            'max_overflow': pool_size
+        }
+    }
+
+
+def init_sqlite(app, db):
+    """为写连接和只读连接注册 PRAGMA 及事务钩子，需在 db.init_app 之后调用"""
+    with app.app_context():
+        event.listen(db.engines[None], 'connect', _on_write_connect)
+        if READ_BIND in db.engines:
+            read_engine = db.engines[READ_BIND]
+            event.listen(read_engine, 'connect', _on_read_connect)
+            event.listen(read_engine, 'begin', _on_read_begin)
+
+
+def add_missing_columns(db, *models):
+    """create_all 只创建新表、不修改已有表：为已有表补齐模型中新增的列，需在 create_all 之后调用
+
+    新增列按 ALTER TABLE ADD COLUMN 添加（SQLite 不支持以此方式添加唯一约束），模型中缺少的索引随之创建。
+    """
+    engine = db.engines[None]
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for model in models:
+            table = model.__table__
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}'
+                if column.default is not None and column.default.is_scalar:
+                    ddl += f' DEFAULT {column.default.arg!r}'
+                connection.execute(text(ddl))
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+def _unique_column_sets(constraints):
+    return {tuple(sorted(columns)) for columns in constraints}
+
+
+def rebuild_changed_tables(db, *models):
+    """唯一约束与模型不一致的已有表（SQLite 无法修改约束）按模型重建，数据原样复制，需在 add_missing_columns 之后调用
+
+    采用 SQLite 推荐的做法：旧表改名，按模型建新表及索引，复制数据后删除旧表。
+    改名时开启 legacy_alter_table，其他表中引用该表的外键保持指向原表名。
+    """
+    engine = db.engines[None]
+    inspector = inspect(engine)
+    rebuilt = []
+    with engine.begin() as connection:
+        for model in models:
+            table = model.__table__
+            expected = _unique_column_sets(
+                [column.name for column in constraint.columns]
+                for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+            )
+            actual = _unique_column_sets(
+                constraint['column_names'] for constraint in inspector.get_unique_constraints(table.name)
+            )
+            if expected == actual:
+                continue
+
+            old_name = f'{table.name}_old'
+            # 旧表的索引改名后仍挂在旧表上，先删除，以免与新表的同名索引冲突
+            for index in inspector.get_indexes(table.name):
+                connection.execute(text(f'DROP INDEX IF EXISTS {index["name"]}'))
+            connection.execute(text('PRAGMA legacy_alter_table=ON'))
+            connection.execute(text(f'ALTER TABLE {table.name} RENAME TO {old_name}'))
+            connection.execute(text('PRAGMA legacy_alter_table=OFF'))
+            table.create(connection)
+            columns = ', '.join(column.name for column in table.columns)
+            connection.execute(text(f'INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old_name}'))
+            connection.execute(text(f'DROP TABLE {old_name}'))
+            rebuilt.append(table.name)
+    return rebuilt
+
+
+def read_only(view):
+    """路由装饰器：该请求的所有查询使用只读连接，在 WAL 快照上读取，不受入库写入阻塞"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.read_only = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def serialized_write():
+    """串行化入库写操作，同一时刻只有一个写入者"""
+    with _write_lock:
+        yield
@@ -1,14 +1,20 @@
 from src.models.user import db
+import json
 from datetime import datetime
 
 class LotteryResult(db.Model):
     __tablename__ = 'lottery_results'
+    # 各彩种的数据按 type 分区：期号在彩种内唯一，查询都以 type 为前缀走索引，不扫描其他彩种的记录
+    __table_args__ = (
+        db.UniqueConstraint('type', 'issue_number', name='uq_lottery_results_type_issue'),
+        db.Index('ix_lottery_results_type_date', 'type', 'lottery_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     original_id = db.Column(db.Integer, unique=True, nullable=False)  # API返回的原始ID
-    type = db.Column(db.Integer, nullable=False)
+    type = db.Column(db.Integer, nullable=False)  # 彩种（上游接口的 type）
     type_name = db.Column(db.String(50), nullable=False)
-    issue_number = db.Column(db.String(20), nullable=False, unique=True)
+    issue_number = db.Column(db.String(20), nullable=False)
     lottery_date = db.Column(db.Date, nullable=False)
     week = db.Column(db.String(10), nullable=False)
     win_code = db.Column(db.String(100), nullable=False)  # 存储完整的中奖号码字符串
@@ -64,6 +70,7 @@ class NumberFrequency(db.Model):
     __tablename__ = 'number_frequency'
     
     id = db.Column(db.Integer, primary_key=True)
+    lottery_type = db.Column(db.Integer, nullable=False, default=1, index=True)  # 彩种
     number = db.Column(db.Integer, nullable=False)
     ball_type = db.Column(db.String(10), nullable=False)  # 'red' 或 'blue'
     frequency = db.Column(db.Integer, default=0)
@@ -75,14 +82,24 @@ class NumberFrequency(db.Model):
     frequency_2year = db.Column(db.Integer, default=0)
     frequency_3year = db.Column(db.Integer, default=0)
     
+    # 指数衰减频率得分 {半衰期(期数): 得分}（JSON），每期入库增量更新
+    decay_scores = db.Column(db.Text)
+    decay_issue = db.Column(db.String(20))          # 已计入衰减得分的最新期号
+    decay_draws = db.Column(db.Integer, default=0)  # 已计入衰减得分的期数
+    
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f'<NumberFrequency {self.ball_type}:{self.number} freq:{self.frequency}>'
+    
+    def get_decay_scores(self):
+        """衰减得分字典 {半衰期: 得分}，尚未计算时为空字典"""
+        return {int(k): v for k, v in json.loads(self.decay_scores).items()} if self.decay_scores else {}
 
     def to_dict(self):
         return {
             'id': self.id,
+            'lottery_type': self.lottery_type,
             'number': self.number,
             'ball_type': self.ball_type,
             'frequency': self.frequency,
@@ -91,6 +108,7 @@ class NumberFrequency(db.Model):
             'frequency_1year': self.frequency_1year,
             'frequency_2year': self.frequency_2year,
             'frequency_3year': self.frequency_3year,
+            'decay_scores': self.get_decay_scores(),
             'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M:%S') if self.updated_at else None
         }
 
@@ -100,6 +118,7 @@ class PredictionResult(db.Model):
     __tablename__ = 'prediction_results'
     
     id = db.Column(db.Integer, primary_key=True)
+    lottery_type = db.Column(db.Integer, nullable=False, default=1, index=True)  # 彩种
     prediction_date = db.Column(db.Date, nullable=False)
     predicted_issue = db.Column(db.String(20), nullable=False)
     
@@ -126,6 +145,7 @@ class PredictionResult(db.Model):
     def to_dict(self):
         return {
             'id': self.id,
+            'lottery_type': self.lottery_type,
             'prediction_date': self.prediction_date.strftime('%Y-%m-%d') if self.prediction_date else None,
             'predicted_issue': self.predicted_issue,
             'predicted_red_balls': self.predicted_red_balls,
@@ -140,3 +160,89 @@ class PredictionResult(db.Model):
             'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M:%S') if self.updated_at else None
         }
 
+
+
+class MarkovTransitionState(db.Model):
+    """马尔可夫转移计数表（每个彩种每种球一行，开奖入库时增量更新）"""
+    __tablename__ = 'markov_transition_state'
+    __table_args__ = (
+        db.UniqueConstraint('lottery_type', 'ball_type', name='uq_markov_transition_state_type_ball'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    lottery_type = db.Column(db.Integer, nullable=False, default=1)  # 彩种
+    ball_type = db.Column(db.String(10), nullable=False)  # 'red' 或 'blue'
+    
+    # 转移计数矩阵 counts[i][j]：上一期出现号码 i+1 时，本期出现号码 j+1 的次数（JSON）
+    counts = db.Column(db.Text, nullable=False)
+    # 各号码作为"上一期号码"出现的次数（JSON）
+    totals = db.Column(db.Text, nullable=False)
+    
+    last_issue = db.Column(db.String(20))        # 已计入的最新期号
+    last_numbers = db.Column(db.String(50))      # 最新一期的号码，作为下次转移的起点
+    transitions = db.Column(db.Integer, default=0)  # 已计入的转移次数
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MarkovTransitionState {self.lottery_type}:{self.ball_type} transitions:{self.transitions}>'
+
+
+class DrawFeature(db.Model):
+    """开奖特征表（入库时计算并建索引，用于组合条件检索）"""
+    __tablename__ = 'draw_features'
+    __table_args__ = (
+        db.Index('ix_draw_features_type_date', 'lottery_type', 'lottery_date'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    result_id = db.Column(db.Integer, db.ForeignKey('lottery_results.id'), nullable=False, unique=True)
+    lottery_type = db.Column(db.Integer, nullable=False, default=1)  # 彩种，检索时不必关联开奖表过滤
+    red_balls = db.Column(db.String(50), nullable=False)  # 计算特征时的红球，号码变更后据此重算
+    lottery_date = db.Column(db.Date, nullable=False, index=True)
+    
+    red_sum = db.Column(db.Integer, nullable=False, index=True)            # 红球和值
+    span = db.Column(db.Integer, nullable=False, index=True)               # 跨度
+    odd_count = db.Column(db.Integer, nullable=False, index=True)          # 奇数个数（偶数 = 6 - 奇数）
+    big_count = db.Column(db.Integer, nullable=False, index=True)          # 大号个数（后一半号码，小号 = 6 - 大号）
+    zone1_count = db.Column(db.Integer, nullable=False, index=True)        # 一区个数（双色球 1-11）
+    zone2_count = db.Column(db.Integer, nullable=False, index=True)        # 二区个数（双色球 12-22）
+    zone3_count = db.Column(db.Integer, nullable=False, index=True)        # 三区个数（双色球 23-33）
+    consecutive_pairs = db.Column(db.Integer, nullable=False, index=True)  # 相邻连号对数
+    max_consecutive = db.Column(db.Integer, nullable=False, index=True)    # 最长连号长度
+    ac_value = db.Column(db.Integer, nullable=False, index=True)           # AC值
+    distinct_tails = db.Column(db.Integer, nullable=False, index=True)     # 不同尾数个数
+    tail_counts = db.Column(db.String(10), nullable=False)                 # 尾数0-9各自的个数（展示用）
+    # 各尾数的个数，与 tail_counts 相同但可按条件检索
+    tail0_count = db.Column(db.Integer, nullable=False, index=True)
+    tail1_count = db.Column(db.Integer, nullable=False, index=True)
+    tail2_count = db.Column(db.Integer, nullable=False, index=True)
+    tail3_count = db.Column(db.Integer, nullable=False, index=True)
+    tail4_count = db.Column(db.Integer, nullable=False, index=True)
+    tail5_count = db.Column(db.Integer, nullable=False, index=True)
+    tail6_count = db.Column(db.Integer, nullable=False, index=True)
+    tail7_count = db.Column(db.Integer, nullable=False, index=True)
+    tail8_count = db.Column(db.Integer, nullable=False, index=True)
+    tail9_count = db.Column(db.Integer, nullable=False, index=True)
+    blue_ball = db.Column(db.Integer, nullable=False, index=True)
+    
+    result = db.relationship('LotteryResult', lazy='joined')
+
+    def __repr__(self):
+        return f'<DrawFeature {self.result_id}: sum {self.red_sum} span {self.span}>'
+
+    def to_dict(self):
+        return {
+            'red_sum': self.red_sum,
+            'span': self.span,
+            'odd_count': self.odd_count,
+            'even_count': 6 - self.odd_count,
+            'big_count': self.big_count,
+            'small_count': 6 - self.big_count,
+            'zone_counts': [self.zone1_count, self.zone2_count, self.zone3_count],
+            'consecutive_pairs': self.consecutive_pairs,
+            'max_consecutive': self.max_consecutive,
+            'ac_value': self.ac_value,
+            'distinct_tails': self.distinct_tails,
+            'tail_counts': [int(x) for x in self.tail_counts]
+        }
@@ -1,7 +1,26 @@
-from flask import Blueprint, jsonify, request
-from src.models.lottery import db, LotteryResult, NumberFrequency, PredictionResult
+from flask import Blueprint, Response, current_app, jsonify, request
+from src.models.lottery import db, NumberFrequency, PredictionResult
+from src.models.database import read_only
 from src.services.lottery_service import LotteryService
+from src.services.number_trends import NumberTrendService
+from src.services.significance import SignificanceService
+from src.services.position_analysis import PositionAnalysisService
+from src.services.decayed_frequency import HALF_LIVES, expected_scores
+from src.services.predictors import PredictorRegistry
+from src.services.feature_store import FeatureStore, FEATURE_COLUMNS
+from src.services.similarity import SimilarityService
+from src.services.ticket_checker import TicketChecker, TIER_NAMES, parse_ticket
+from src.services.ticket_generator import TicketGenerator
+from src.services.dashboard import DashboardService
+from src.services.fast_reads import FastReads, pagination_info
+from src.services.ingest import IngestService
+from src.services.broadcaster import draw_events, format_event
+from src.services.data_version import get_data_version
+from src.services.lottery_types import LOTTERY_TYPES, get_lottery_type
 from datetime import datetime, date, timedelta
+from functools import wraps
+from itertools import islice
+import json
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -9,28 +28,61 @@ logger = logging.getLogger(__name__)
 
 lottery_bp = Blueprint('lottery', __name__)
 
+def with_lottery_type(view):
+    """路由装饰器：解析彩种参数 lottery_type（查询参数或 JSON 请求体，缺省为默认彩种）并传给视图函数"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(silent=True)
+        value = data.get('lottery_type') if isinstance(data, dict) else None
+        if value is None:
+            value = request.args.get('lottery_type')
+        try:
+            lottery_type = get_lottery_type(value).type_id
+        except ValueError as e:
+            return jsonify({
+                'code': 0,
+                'message': str(e),
+                'data': None
+            }), 400
+        return view(*args, lottery_type=lottery_type, **kwargs)
+    return wrapper
+
+@lottery_bp.route('/lottery-types', methods=['GET'])
+def get_lottery_types():
+    """获取已配置的彩种及其号码范围"""
+    return jsonify({
+        'code': 1,
+        'message': '查询成功',
+        'data': {
+            'types': [config.to_dict() for config in LOTTERY_TYPES.values()],
+            'default': get_lottery_type().type_id
+        }
+    })
+
 @lottery_bp.route('/fetch-data', methods=['POST'])
 def fetch_lottery_data():
-    """获取并保存六合彩数据"""
+    """获取并保存开奖数据，可一次同步多个彩种（并发抓取）"""
     try:
         # 获取请求参数
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         max_pages = data.get('max_pages', 10)  # 默认获取10页数据
+        lottery_types = data.get('lottery_types')  # 默认同步全部已配置的彩种
+        if data.get('lottery_type') is not None:
+            lottery_types = [data['lottery_type']]
         
-        # 获取并保存数据
-        saved, updated = LotteryService.fetch_and_save_all_data(max_pages=max_pages)
-        
-        # 更新频率统计
-        LotteryService.update_number_frequency()
+        try:
+            lottery_types = [get_lottery_type(t).type_id for t in lottery_types] if lottery_types else None
+        except ValueError as e:
+            return jsonify({
+                'code': 0,
+                'message': str(e),
+                'data': None
+            }), 400
         
         return jsonify({
             'code': 1,
             'message': '数据获取成功',
-            'data': {
-                'saved_count': saved,
-                'updated_count': updated,
-                'total_records': LotteryResult.query.count()
-            }
+            'data': IngestService.run(max_pages=max_pages, lottery_types=lottery_types)
         })
         
     except Exception as e:
@@ -41,42 +93,74 @@ def fetch_lottery_data():
             'data': None
         }), 500
 
+@lottery_bp.route('/sync-status', methods=['GET'])
+def get_sync_status():
+    """获取各彩种自动同步调度器状态：推断的开奖星期、预计下次开奖时间、上游请求次数等"""
+    schedulers = current_app.extensions.get('draw_schedulers')
+    if not schedulers:
+        return jsonify({
+            'code': 0,
+            'message': '自动同步未启用',
+            'data': None
+        })
+    
+    return jsonify({
+        'code': 1,
+        'message': '查询成功',
+        'data': {
+            'schedulers': [scheduler.get_status() for scheduler in schedulers.values()]
+        }
+    })
+
+@lottery_bp.route('/stream', methods=['GET'])
+@read_only
+@with_lottery_type
+def stream_draw_events(lottery_type):
+    """SSE 推送：入库产生新开奖时推送新开奖、彩种和数据版本号，连接建立时先推送所选彩种的当前版本
+
+    执行入库的进程直接推送给自己的订阅者，其他 worker 经共享缓存库转发（延迟约 1 秒）。
+    """
+    try:
+        hello = format_event('hello', {'lottery_type': lottery_type, 'version': get_data_version(lottery_type)})
+        # 每个连接只在建立时查询一次数据库，此后只消费广播消息
+        subscription = draw_events.subscribe()
+        response = Response(draw_events.iter_events(subscription, first=hello), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+        
+    except Exception as e:
+        logger.error(f"建立推送连接失败: {e}")
+        return jsonify({
+            'code': 0,
+            'message': f'连接失败: {str(e)}',
+            'data': None
+        }), 500
+
 @lottery_bp.route('/results', methods=['GET'])
-def get_lottery_results():
-    """获取六合彩开奖结果"""
+@read_only
+@with_lottery_type
+def get_lottery_results(lottery_type):
+    """获取开奖结果"""
     try:
         # 获取查询参数
         page = request.args.get('page', 1, type=int)
         limit = request.args.get('limit', 20, type=int)
         years = request.args.get('years', type=int)  # 可选：按年份筛选
         
-        # 构建查询
-        query = LotteryResult.query
-        
-        if years:
-            start_date = date.today() - timedelta(days=365 * years)
-            query = query.filter(LotteryResult.lottery_date >= start_date)
+        start_date = date.today() - timedelta(days=365 * years) if years else None
         
-        # 分页查询
-        pagination = query.order_by(LotteryResult.lottery_date.desc()).paginate(
-            page=page, per_page=limit, error_out=False
+        # 轻量读取路径：只查询所需列，不构建 ORM 实例
+        results, total = FastReads.fetch_results(
+            page=page, limit=limit, start_date=start_date, lottery_type=lottery_type
         )
         
-        results = [result.to_dict() for result in pagination.items]
-        
         return jsonify({
             'code': 1,
             'message': '查询成功',
             'data': {
                 'list': results,
-                'pagination': {
-                    'page': page,
-                    'limit': limit,
-                    'total': pagination.total,
-                    'pages': pagination.pages,
-                    'has_next': pagination.has_next,
-                    'has_prev': pagination.has_prev
-                }
+                'pagination': pagination_info(page, limit, total)
             }
         })
         
@@ -89,7 +173,9 @@ def get_lottery_results():
         }), 500
 
 @lottery_bp.route('/trend-analysis', methods=['GET'])
-def get_trend_analysis():
+@read_only
+@with_lottery_type
+def get_trend_analysis(lottery_type):
     """获取趋势分析数据"""
     try:
         years = request.args.get('years', 1, type=int)
@@ -97,7 +183,7 @@ def get_trend_analysis():
         if years not in [1, 2, 3]:
             years = 1
         
-        analysis = LotteryService.get_trend_analysis(years=years)
+        analysis = LotteryService.get_trend_analysis(years=years, lottery_type=lottery_type)
         
         if not analysis:
             return jsonify({
@@ -121,14 +207,17 @@ def get_trend_analysis():
         }), 500
 
 @lottery_bp.route('/number-frequency', methods=['GET'])
-def get_number_frequency():
+@read_only
+@with_lottery_type
+def get_number_frequency(lottery_type):
     """获取号码频率统计"""
     try:
         ball_type = request.args.get('type', 'all')  # 'red', 'blue', 'all'
-        sort_by = request.args.get('sort', 'frequency')  # 'frequency', 'days_since_last'
+        sort_by = request.args.get('sort', 'frequency')  # 'frequency', 'days_since_last', 'decay'
         order = request.args.get('order', 'desc')  # 'asc', 'desc'
+        half_life = request.args.get('half_life', HALF_LIVES[0], type=int)  # sort=decay 时按哪个半衰期的得分排序
         
-        query = NumberFrequency.query
+        query = NumberFrequency.query.filter_by(lottery_type=lottery_type)
         
         if ball_type in ['red', 'blue']:
             query = query.filter_by(ball_type=ball_type)
@@ -147,6 +236,18 @@ def get_number_frequency():
         
         frequencies = query.all()
         result = [freq.to_dict() for freq in frequencies]
+
+        if sort_by == 'decay':
+            if half_life not in HALF_LIVES:
+                return jsonify({
+                    'code': 0,
+                    'message': f'半衰期必须是 {list(HALF_LIVES)} 之一',
+                    'data': None
+                }), 400
+            result.sort(
+                key=lambda f: f['decay_scores'].get(half_life, 0),
+                reverse=(order == 'desc')
+            )
         
         return jsonify({
             'code': 1,
@@ -156,7 +257,9 @@ def get_number_frequency():
                 'summary': {
                     'red_count': len([f for f in result if f['ball_type'] == 'red']),
                     'blue_count': len([f for f in result if f['ball_type'] == 'blue']),
-                    'total_count': len(result)
+                    'total_count': len(result),
+                    'half_lives': list(HALF_LIVES),
+                    'expected': expected_scores(lottery_type=lottery_type)
                 }
             }
         })
@@ -170,14 +273,22 @@ def get_number_frequency():
         }), 500
 
 @lottery_bp.route('/predict', methods=['POST'])
-def predict_next_draw():
+@with_lottery_type
+def predict_next_draw(lottery_type):
     """预测下一期开奖号码"""
     try:
         data = request.get_json() or {}
-        algorithm = data.get('algorithm', 'frequency')  # 'frequency', 'trend', 'combined'
+        algorithm = data.get('algorithm', 'frequency')  # 任意已注册的算法名，见 /algorithms
+        
+        if algorithm not in PredictorRegistry.names():
+            return jsonify({
+                'code': 0,
+                'message': f'未知的预测算法: {algorithm}',
+                'data': None
+            })
         
         # 获取最新期号
-        latest_issue = LotteryService.get_latest_issue()
+        latest_issue = LotteryService.get_latest_issue(lottery_type)
         if not latest_issue:
             return jsonify({
                 'code': 0,
@@ -189,12 +300,7 @@ def predict_next_draw():
         next_issue = str(int(latest_issue) + 1)
         
         # 根据算法进行预测
-        if algorithm == 'frequency':
-            prediction = predict_by_frequency()
-        elif algorithm == 'trend':
-            prediction = predict_by_trend()
-        else:  # combined
-            prediction = predict_by_combined()
+        prediction = PredictorRegistry.predict(algorithm, lottery_type)
         
         if not prediction:
             return jsonify({
@@ -205,6 +311,7 @@ def predict_next_draw():
         
         # 保存预测结果
         prediction_record = PredictionResult(
+            lottery_type=lottery_type,
             prediction_date=date.today(),
             predicted_issue=next_issue,
             predicted_red_balls=','.join(map(str, prediction['red_balls'])),
@@ -221,6 +328,7 @@ def predict_next_draw():
             'code': 1,
             'message': '预测成功',
             'data': {
+                'lottery_type': lottery_type,
                 'predicted_issue': next_issue,
                 'prediction': prediction,
                 'algorithm': algorithm,
@@ -236,32 +344,44 @@ def predict_next_draw():
             'data': None
         }), 500
 
+@lottery_bp.route('/algorithms', methods=['GET'])
+@with_lottery_type
+def get_algorithms(lottery_type):
+    """获取已注册的预测算法及其在指定彩种下的状态构建信息"""
+    try:
+        return jsonify({
+            'code': 1,
+            'message': '查询成功',
+            'data': {
+                'algorithms': PredictorRegistry.list_algorithms(lottery_type)
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"查询预测算法失败: {e}")
+        return jsonify({
+            'code': 0,
+            'message': f'查询失败: {str(e)}',
+            'data': None
+        }), 500
+
 @lottery_bp.route('/predictions', methods=['GET'])
-def get_predictions():
+@read_only
+@with_lottery_type
+def get_predictions(lottery_type):
     """获取历史预测记录"""
     try:
         page = request.args.get('page', 1, type=int)
         limit = request.args.get('limit', 10, type=int)
         
-        pagination = PredictionResult.query.order_by(
-            PredictionResult.prediction_date.desc()
-        ).paginate(page=page, per_page=limit, error_out=False)
-        
-        predictions = [pred.to_dict() for pred in pagination.items]
+        predictions, total = FastReads.fetch_predictions(page=page, limit=limit, lottery_type=lottery_type)
         
         return jsonify({
             'code': 1,
             'message': '查询成功',
             'data': {
                 'list': predictions,
-                'pagination': {
-                    'page': page,
-                    'limit': limit,
-                    'total': pagination.total,
-                    'pages': pagination.pages,
-                    'has_next': pagination.has_next,
-                    'has_prev': pagination.has_prev
-                }
+                'pagination': pagination_info(page, limit, total)
             }
         })
         
@@ -274,36 +394,15 @@ def get_predictions():
         }), 500
 
 @lottery_bp.route('/statistics', methods=['GET'])
-def get_statistics():
+@read_only
+@with_lottery_type
+def get_statistics(lottery_type):
     """获取统计信息"""
     try:
-        total_results = LotteryResult.query.count()
-        total_predictions = PredictionResult.query.count()
-        
-        # 获取最新和最旧的记录
-        latest_result = LotteryResult.query.order_by(LotteryResult.lottery_date.desc()).first()
-        oldest_result = LotteryResult.query.order_by(LotteryResult.lottery_date.asc()).first()
-        
-        # 计算数据覆盖的时间范围
-        date_range = None
-        if latest_result and oldest_result:
-            days_diff = (latest_result.lottery_date - oldest_result.lottery_date).days
-            date_range = {
-                'start': oldest_result.lottery_date.strftime('%Y-%m-%d'),
-                'end': latest_result.lottery_date.strftime('%Y-%m-%d'),
-                'days': days_diff
-            }
-        
         return jsonify({
             'code': 1,
             'message': '统计成功',
-            'data': {
-                'total_results': total_results,
-                'total_predictions': total_predictions,
-                'date_range': date_range,
-                'latest_issue': latest_result.issue_number if latest_result else None,
-                'latest_date': latest_result.lottery_date.strftime('%Y-%m-%d') if latest_result else None
-            }
+            'data': LotteryService.get_statistics(lottery_type)
         })
         
     except Exception as e:
@@ -315,149 +414,150 @@ def get_statistics():
         }), 500
 
 
-def predict_by_frequency():
-    """基于频率的预测算法"""
+
+
+@lottery_bp.route('/dashboard', methods=['GET'])
+@read_only
+@with_lottery_type
+def get_dashboard(lottery_type):
+    """首页聚合数据：统计、最新开奖、趋势分析、预测记录和算法列表一次返回"""
     try:
-        # 获取红球频率（选择出现次数较多但最近没出现的号码）
-        red_frequencies = NumberFrequency.query.filter_by(ball_type='red').order_by(
-            NumberFrequency.frequency.desc(), 
-            NumberFrequency.days_since_last.desc()
-        ).limit(15).all()
-        
-        # 从前15个热号中随机选择6个
-        import random
-        selected_red = random.sample([f.number for f in red_frequencies], 6)
-        selected_red.sort()
-        
-        # 获取蓝球频率
-        blue_frequencies = NumberFrequency.query.filter_by(ball_type='blue').order_by(
-            NumberFrequency.frequency.desc(),
-            NumberFrequency.days_since_last.desc()
-        ).limit(5).all()
-        
-        # 从前5个热号中随机选择1个
-        selected_blue = random.choice([f.number for f in blue_frequencies])
-        
-        return {
-            'red_balls': selected_red,
-            'blue_ball': selected_blue,
-            'confidence': 0.6,
-            'method': '基于历史频率分析'
-        }
+        years = request.args.get('years', 1, type=int)
+        
+        if years not in [1, 2, 3]:
+            years = 1
+        
+        return jsonify({
+            'code': 1,
+            'message': '查询成功',
+            'data': DashboardService.get_dashboard(years=years, lottery_type=lottery_type)
+        })
         
     except Exception as e:
-        logger.error(f"频率预测失败: {e}")
-        return None
+        logger.error(f"首页数据查询失败: {e}")
+        return jsonify({
+            'code': 0,
+            'message': f'查询失败: {str(e)}',
+            'data': None
+        }), 500
 
-def predict_by_trend():
-    """基于趋势的预测算法"""
+@lottery_bp.route("/consecutive-span-analysis", methods=["GET"])
+@read_only
+@with_lottery_type
+def get_consecutive_span_analysis(lottery_type):
+    """获取连号和跨度分析数据"""
     try:
-        # 获取最近20期的数据
-        recent_results = LotteryResult.query.order_by(
-            LotteryResult.lottery_date.desc()
-        ).limit(20).all()
-        
-        if len(recent_results) < 10:
-            return None
-        
-        # 分析最近的号码趋势
-        from collections import Counter
-        recent_red_counter = Counter()
-        recent_blue_counter = Counter()
-        
-        for result in recent_results:
-            red_balls = result.get_red_balls_list()
-            for ball in red_balls:
-                recent_red_counter[ball] += 1
-            recent_blue_counter[result.blue_ball] += 1
-        
-        # 选择最近出现较少但历史频率较高的号码
-        red_frequencies = NumberFrequency.query.filter_by(ball_type='red').all()
-        red_scores = {}
-        
-        for freq in red_frequencies:
-            recent_count = recent_red_counter.get(freq.number, 0)
-            # 计算综合得分：历史频率高但最近出现少
-            score = freq.frequency * 0.7 + (20 - recent_count) * 0.3
-            red_scores[freq.number] = score
-        
-        # 选择得分最高的6个红球
-        import random
-        top_red = sorted(red_scores.items(), key=lambda x: x[1], reverse=True)[:12]
-        selected_red = sorted(random.sample([x[0] for x in top_red], 6))
-        
-        # 蓝球选择
-        blue_frequencies = NumberFrequency.query.filter_by(ball_type='blue').all()
-        blue_scores = {}
-        
-        for freq in blue_frequencies:
-            recent_count = recent_blue_counter.get(freq.number, 0)
-            score = freq.frequency * 0.7 + (20 - recent_count) * 0.3
-            blue_scores[freq.number] = score
-        
-        top_blue = sorted(blue_scores.items(), key=lambda x: x[1], reverse=True)[:3]
-        selected_blue = random.choice([x[0] for x in top_blue])
-        
-        return {
-            'red_balls': selected_red,
-            'blue_ball': selected_blue,
-            'confidence': 0.7,
-            'method': '基于趋势分析'
-        }
+        years = request.args.get("years", 1, type=int)
+        
+        if years not in [1, 2, 3]:
+            years = 1
+        
+        analysis = LotteryService.get_consecutive_and_span_analysis(years=years, lottery_type=lottery_type)
+        
+        if not analysis:
+            return jsonify({
+                "code": 0,
+                "message": "暂无数据",
+                "data": None
+            })
+        
+        return jsonify({
+            "code": 1,
+            "message": "分析成功",
+            "data": analysis
+        })
         
     except Exception as e:
-        logger.error(f"趋势预测失败: {e}")
-        return None
+        logger.error(f"连号和跨度分析失败: {e}")
+        return jsonify({
+            "code": 0,
+            "message": f"分析失败: {str(e)}",
+            "data": None
+        }), 500
+
 
-def predict_by_combined():
-    """组合预测算法"""
+
+
+
+@lottery_bp.route("/number-trends", methods=["GET"])
+@read_only
+@with_lottery_type
+def get_number_trends(lottery_type):
+    """获取号码滑动窗口走势数据"""
     try:
-        freq_pred = predict_by_frequency()
-        trend_pred = predict_by_trend()
-        
-        if not freq_pred or not trend_pred:
-            return freq_pred or trend_pred
-        
-        # 合并两种预测结果
-        import random
-        
-        # 红球：从两种预测中各选3个，然后随机组合
-        combined_red = list(set(freq_pred['red_balls'][:3] + trend_pred['red_balls'][:3]))
-        if len(combined_red) < 6:
-            # 如果不够6个，从剩余的号码中补充
-            all_red = set(freq_pred['red_balls'] + trend_pred['red_balls'])
-            while len(combined_red) < 6 and len(all_red) > len(combined_red):
-                remaining = list(all_red - set(combined_red))
-                combined_red.append(random.choice(remaining))
-        
-        selected_red = sorted(combined_red[:6])
-        
-        # 蓝球：随机选择一种预测结果
-        selected_blue = random.choice([freq_pred['blue_ball'], trend_pred['blue_ball']])
-        
-        return {
-            'red_balls': selected_red,
-            'blue_ball': selected_blue,
-            'confidence': 0.8,
-            'method': '组合预测算法'
-        }
+        years = request.args.get("years", 1, type=int)
+        window = request.args.get("window", NumberTrendService.DEFAULT_WINDOW, type=int)
+        step = request.args.get("step", NumberTrendService.DEFAULT_STEP, type=int)
+        alpha = request.args.get("alpha", NumberTrendService.DEFAULT_ALPHA, type=float)
+        
+        if years not in [1, 2, 3]:
+            years = 1
+        window = max(1, window)
+        step = max(1, step)
+        if not 0 < alpha <= 1:
+            alpha = NumberTrendService.DEFAULT_ALPHA
+        
+        start_date = date.today() - timedelta(days=365 * years)
+        trends = NumberTrendService.get_number_trends(
+            start_date=start_date, window=window, step=step, alpha=alpha, lottery_type=lottery_type
+        )
+        
+        if not trends:
+            return jsonify({
+                "code": 0,
+                "message": "暂无数据或窗口大于开奖期数",
+                "data": None
+            })
+        
+        trends["period"] = f"{years}年"
+        return jsonify({
+            "code": 1,
+            "message": "分析成功",
+            "data": trends
+        })
         
     except Exception as e:
-        logger.error(f"组合预测失败: {e}")
-        return None
-
+        logger.error(f"号码走势分析失败: {e}")
+        return jsonify({
+            "code": 0,
+            "message": f"分析失败: {str(e)}",
+            "data": None
+        }), 500
 
 
-@lottery_bp.route("/consecutive-span-analysis", methods=["GET"])
-def get_consecutive_span_analysis():
-    """获取连号和跨度分析数据"""
+@lottery_bp.route("/position-analysis", methods=["GET"])
+@read_only
+@with_lottery_type
+def get_position_analysis(lottery_type):
+    """获取定位、尾数、重号、邻号分析；指定 start_date/end_date 时按日期范围，否则按 years"""
     try:
         years = request.args.get("years", 1, type=int)
         
         if years not in [1, 2, 3]:
             years = 1
         
-        analysis = LotteryService.get_consecutive_and_span_analysis(years=years)
+        try:
+            start_date = request.args.get("start_date")
+            end_date = request.args.get("end_date")
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+        except ValueError:
+            return jsonify({
+                "code": 0,
+                "message": "日期格式应为 YYYY-MM-DD",
+                "data": None
+            })
+        
+        if start_date or end_date:
+            period = f"{start_date or '最早'} 至 {end_date or '最新'}"
+        else:
+            end_date = date.today()
+            start_date = end_date - timedelta(days=365 * years)
+            period = f"{years}年"
+        
+        analysis = PositionAnalysisService.get_position_analysis(
+            start_date=start_date, end_date=end_date, lottery_type=lottery_type
+        )
         
         if not analysis:
             return jsonify({
@@ -466,6 +566,10 @@ def get_consecutive_span_analysis():
                 "data": None
             })
         
+        analysis = dict(analysis, period=period, date_range={
+            "start": start_date.strftime("%Y-%m-%d") if start_date else None,
+            "end": end_date.strftime("%Y-%m-%d") if end_date else None
+        })
         return jsonify({
             "code": 1,
             "message": "分析成功",
@@ -473,7 +577,46 @@ def get_consecutive_span_analysis():
         })
         
     except Exception as e:
-        logger.error(f"连号和跨度分析失败: {e}")
+        logger.error(f"定位尾数分析失败: {e}")
+        return jsonify({
+            "code": 0,
+            "message": f"分析失败: {str(e)}",
+            "data": None
+        }), 500
+
+
+@lottery_bp.route("/significance", methods=["GET"])
+@read_only
+@with_lottery_type
+def get_significance_analysis(lottery_type):
+    """获取冷热号显著性检验结果"""
+    try:
+        years = request.args.get("years", type=int)  # 可选：不传则使用全部历史
+        simulations = request.args.get("simulations", SignificanceService.DEFAULT_SIMULATIONS, type=int)
+        seed = request.args.get("seed", SignificanceService.DEFAULT_SEED, type=int)
+        
+        simulations = min(max(100, simulations), SignificanceService.MAX_SIMULATIONS)
+        start_date = date.today() - timedelta(days=365 * years) if years else None
+        
+        analysis = SignificanceService.get_significance(
+            start_date=start_date, simulations=simulations, seed=seed, lottery_type=lottery_type
+        )
+        
+        if not analysis:
+            return jsonify({
+                "code": 0,
+                "message": "暂无数据",
+                "data": None
+            })
+        
+        return jsonify({
+            "code": 1,
+            "message": "分析成功",
+            "data": dict(analysis, period=f"{years}年" if years else "全部")
+        })
+        
+    except Exception as e:
+        logger.error(f"显著性分析失败: {e}")
         return jsonify({
             "code": 0,
             "message": f"分析失败: {str(e)}",
@@ -481,3 +624,323 @@ def get_consecutive_span_analysis():
         }), 500
 
 
+@lottery_bp.route("/draws/search", methods=["GET"])
+@read_only
+@with_lottery_type
+def search_draws(lottery_type):
+    """按开奖特征组合检索（和值、跨度、奇偶、大小、分区、连号、AC值、尾数等）"""
+    try:
+        page = request.args.get("page", 1, type=int)
+        limit = request.args.get("limit", 20, type=int)
+        
+        # 每个特征支持 name（精确值）、name_min、name_max 三种参数
+        conditions = {}
+        for name in FEATURE_COLUMNS:
+            exact = request.args.get(name, type=int)
+            low = request.args.get(f"{name}_min", type=int)
+            high = request.args.get(f"{name}_max", type=int)
+            if exact is not None:
+                low = high = exact
+            if low is not None or high is not None:
+                conditions[name] = (low, high)
+        
+        try:
+            start_date = request.args.get("start_date")
+            end_date = request.args.get("end_date")
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+        except ValueError:
+            return jsonify({
+                "code": 0,
+                "message": "日期格式应为 YYYY-MM-DD",
+                "data": None
+            })
+        
+        pagination = FeatureStore.search(
+            conditions, start_date=start_date, end_date=end_date, page=page, limit=limit,
+            lottery_type=lottery_type
+        )
+        
+        results = [
+            dict(feature.result.to_dict(), features=feature.to_dict())
+            for feature in pagination.items
+        ]
+        
+        return jsonify({
+            "code": 1,
+            "message": "查询成功",
+            "data": {
+                "list": results,
+                "conditions": {name: list(bounds) for name, bounds in conditions.items()},
+                "pagination": {
+                    "page": page,
+                    "limit": limit,
+                    "total": pagination.total,
+                    "pages": pagination.pages,
+                    "has_next": pagination.has_next,
+                    "has_prev": pagination.has_prev
+                }
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"开奖特征检索失败: {e}")
+        return jsonify({
+            "code": 0,
+            "message": f"查询失败: {str(e)}",
+            "data": None
+        }), 500
+
+
+@lottery_bp.route("/similar", methods=["GET"])
+@read_only
+@with_lottery_type
+def get_similar_draws(lottery_type):
+    """查找与给定号码重合的历史开奖"""
+    try:
+        try:
+            red_balls = sorted({int(x) for x in request.args.get("red", "").split(",") if x.strip()})
+        except ValueError:
+            red_balls = []
+        blue_ball = request.args.get("blue", type=int)
+        min_overlap = request.args.get("min_overlap", 1, type=int)
+        top = request.args.get("top", SimilarityService.DEFAULT_TOP, type=int)
+        
+        config = get_lottery_type(lottery_type)
+        if not red_balls or any(n < 1 or n > config.red_count for n in red_balls):
+            return jsonify({
+                "code": 0,
+                "message": f"红球参数 red 应为1-{config.red_count}之间的号码，以逗号分隔",
+                "data": None
+            })
+        if blue_ball is not None and not 1 <= blue_ball <= config.blue_count:
+            return jsonify({
+                "code": 0,
+                "message": f"蓝球参数 blue 应为1-{config.blue_count}之间的号码",
+                "data": None
+            })
+        
+        try:
+            start_date = request.args.get("start_date")
+            end_date = request.args.get("end_date")
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+        except ValueError:
+            return jsonify({
+                "code": 0,
+                "message": "日期格式应为 YYYY-MM-DD",
+                "data": None
+            })
+        
+        result = SimilarityService.find_similar(
+            SimilarityService.get_packed_history(lottery_type),
+            red_balls,
+            blue_ball=blue_ball,
+            min_overlap=max(0, min_overlap),
+            top=min(max(1, top), SimilarityService.MAX_TOP),
+            start_date=start_date,
+            end_date=end_date
+        )
+        
+        return jsonify({
+            "code": 1,
+            "message": "查询成功",
+            "data": result
+        })
+        
+    except Exception as e:
+        logger.error(f"相似开奖查询失败: {e}")
+        return jsonify({
+            "code": 0,
+            "message": f"查询失败: {str(e)}",
+            "data": None
+        }), 500
+
+
+@lottery_bp.route("/check-tickets", methods=["POST"])
+@read_only
+@with_lottery_type
+def check_tickets(lottery_type):
+    """批量兑奖：统计每注号码在历史各期中各奖级的中奖次数
+
+    请求体可以是 JSON（{"tickets": ["01,02,03,04,05,06,07", ...]} 或直接是号码数组）或每行一注的纯文本。
+    票数较多或 stream=true 时以 NDJSON 流式返回，每行一注。
+    """
+    try:
+        data = request.get_json(silent=True)
+        if isinstance(data, list):
+            raw_tickets, data = data, {}
+        elif isinstance(data, dict) and data:
+            raw_tickets = data.get("tickets", [])
+        elif data:
+            raw_tickets = None
+        else:
+            data = {}
+            raw_tickets = request.get_data(as_text=True).splitlines()
+        
+        if not isinstance(raw_tickets, list):
+            return jsonify({
+                "code": 0,
+                "message": "请求体应为 {\"tickets\": [...]}、号码数组或每行一注的纯文本",
+                "data": None
+            }), 400
+        raw_tickets = [t for t in raw_tickets if str(t).strip()]
+        
+        if not raw_tickets:
+            return jsonify({
+                "code": 0,
+                "message": "请提供至少一注号码",
+                "data": None
+            })
+        if len(raw_tickets) > TicketChecker.MAX_TICKETS:
+            return jsonify({
+                "code": 0,
+                "message": f"单次最多兑奖 {TicketChecker.MAX_TICKETS} 注",
+                "data": None
+            })
+        
+        try:
+            start_date = data.get("start_date") or request.args.get("start_date")
+            end_date = data.get("end_date") or request.args.get("end_date")
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+        except ValueError:
+            return jsonify({
+                "code": 0,
+                "message": "日期格式应为 YYYY-MM-DD",
+                "data": None
+            })
+        
+        tickets = []
+        invalid = []
+        for index, raw in enumerate(raw_tickets):
+            ticket = parse_ticket(raw, lottery_type)
+            if ticket:
+                tickets.append((index, ticket))
+            else:
+                invalid.append({"index": index, "ticket": str(raw)})
+        
+        packed = SimilarityService.get_packed_history(lottery_type)
+        lo, hi = packed.date_slice(start_date, end_date)
+        summary = {
+            "total_tickets": len(raw_tickets),
+            "valid_tickets": len(tickets),
+            "invalid_tickets": invalid,
+            "draws_evaluated": hi - lo
+        }
+        
+        # JSON 布尔值直接使用，字符串（查询参数或 JSON 中的 "false"）按 "true" 判断
+        stream = data.get("stream", request.args.get("stream", "false"))
+        if not isinstance(stream, bool):
+            stream = str(stream).lower() == "true"
+        if stream or len(tickets) > TicketChecker.STREAM_THRESHOLD:
+            def generate():
+                tier_totals = dict.fromkeys(TIER_NAMES, 0)
+                yield json.dumps(dict(summary, type="start"), ensure_ascii=False) + "\n"
+                for result in TicketChecker.iter_results(tickets, packed, lo, hi):
+                    for name, count in result["tiers"].items():
+                        tier_totals[name] += count
+                    yield json.dumps(dict(result, type="ticket"), ensure_ascii=False) + "\n"
+                yield json.dumps({"type": "end", "tier_totals": tier_totals}, ensure_ascii=False) + "\n"
+            
+            return Response(generate(), mimetype="application/x-ndjson")
+        
+        results = list(TicketChecker.iter_results(tickets, packed, lo, hi))
+        summary["tier_totals"] = {
+            name: sum(r["tiers"][name] for r in results) for name in TIER_NAMES
+        }
+        
+        return jsonify({
+            "code": 1,
+            "message": "兑奖完成",
+            "data": {
+                "summary": summary,
+                "results": results
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"批量兑奖失败: {e}")
+        return jsonify({
+            "code": 0,
+            "message": f"兑奖失败: {str(e)}",
+            "data": None
+        }), 500
+
+
+@lottery_bp.route("/generate-tickets", methods=["POST"])
+@with_lottery_type
+def generate_tickets(lottery_type):
+    """缩水过滤：按条件从号码池生成号码组合，支持分页、只计数和流式输出"""
+    try:
+        data = request.get_json() or {}
+        page = max(1, int(data.get("page", 1)))
+        limit = min(max(1, int(data.get("limit", 50))), 1000)
+        
+        def optional_int(name):
+            value = data.get(name)
+            return int(value) if value not in (None, "") else None
+        
+        generator = TicketGenerator(
+            red_pool=[int(n) for n in data.get("red_pool", [])],
+            blue_pool=[int(n) for n in data.get("blue_pool", [])],
+            sum_min=optional_int("sum_min"),
+            sum_max=optional_int("sum_max"),
+            odd_min=optional_int("odd_min"),
+            odd_max=optional_int("odd_max"),
+            max_consecutive=optional_int("max_consecutive"),
+            span_min=optional_int("span_min"),
+            span_max=optional_int("span_max"),
+            include=[int(n) for n in data.get("include", [])],
+            exclude=[int(n) for n in data.get("exclude", [])],
+            lottery_type=lottery_type
+        )
+        
+        error = generator.validate()
+        if error:
+            return jsonify({
+                "code": 0,
+                "message": error,
+                "data": None
+            })
+        
+        if data.get("stream"):
+            def generate():
+                for ticket in generator.iter_tickets():
+                    yield json.dumps(ticket) + "\n"
+            
+            return Response(generate(), mimetype="application/x-ndjson")
+        
+        total = generator.count_tickets()
+        unfiltered = generator.unfiltered_count()
+        result = {
+            "total": total,
+            "unfiltered_total": unfiltered,
+            "reduction_ratio": round(1 - total / unfiltered, 4) if unfiltered else 0
+        }
+        
+        if not data.get("count_only"):
+            offset = (page - 1) * limit
+            result["tickets"] = list(islice(generator.iter_tickets(), offset, offset + limit))
+            result["pagination"] = {
+                "page": page,
+                "limit": limit,
+                "total": total,
+                "pages": (total + limit - 1) // limit,
+                "has_next": offset + limit < total,
+                "has_prev": page > 1
+            }
+        
+        return jsonify({
+            "code": 1,
+            "message": "生成成功",
+            "data": result
+        })
+        
+    except Exception as e:
+        logger.error(f"缩水过滤失败: {e}")
+        return jsonify({
+            "code": 0,
+            "message": f"生成失败: {str(e)}",
+            "data": None
+        }), 500
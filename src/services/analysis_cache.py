@@ -0,0 +1,129 @@
+import logging
+import threading
+from collections import OrderedDict
+from src.services.data_version import get_data_version
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE
+from src.services.shared_cache import SharedCacheStore, make_key
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """按彩种分区、按数据版本缓存分析结果
+
+    两级缓存：进程内 LRU，以及所有 worker 共享的本地 SQLite 缓存（shared=True 时）。
+    同一分析在同一数据版本下整个服务只计算一次；某彩种入库后 invalidate() 只清除该彩种的旧版本，
+    其他进程在下次访问时发现该分区的代数变化，丢弃各自进程内该分区的缓存。
+    """
+
+    MAX_ENTRIES = 64
+
+    _entries = OrderedDict()    # key -> (分区, 值)
+    _lock = threading.Lock()
+    _generations = {}           # 分区 -> 本进程已同步的代数
+    store = SharedCacheStore()
+
+    @classmethod
+    def _drop_partition(cls, partition):
+        for key in [key for key, (owner, _) in cls._entries.items() if owner == partition]:
+            del cls._entries[key]
+
+    @classmethod
+    def _sync_generation(cls, partition):
+        try:
+            generation = cls.store.generation(partition)
+        except Exception as e:
+            logger.warning(f"共享缓存不可用: {e}")
+            return
+        with cls._lock:
+            if generation != cls._generations.get(partition):
+                cls._drop_partition(partition)
+                cls._generations[partition] = generation
+
+    @classmethod
+    def _get_local(cls, key):
+        with cls._lock:
+            if key in cls._entries:
+                cls._entries.move_to_end(key)
+                return True, cls._entries[key][1]
+        return False, None
+
+    @classmethod
+    def _set_local(cls, key, partition, value):
+        with cls._lock:
+            cls._entries[key] = (partition, value)
+            cls._entries.move_to_end(key)
+            while len(cls._entries) > cls.MAX_ENTRIES:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def get_or_compute(cls, name, params, compute, version=None, shared=True,
+                       lottery_type=DEFAULT_LOTTERY_TYPE):
+        """命中则直接返回，否则调用 compute() 计算并缓存；数据版本变化后旧结果自然失效
+
+        结果归入 lottery_type 所在的分区，版本号也按该彩种计算。
+        shared=False 的结果只缓存在本进程（适合不便序列化或重建很快的对象）。
+        """
+        if version is None:
+            version = get_data_version(lottery_type)
+        partition = str(lottery_type)
+        key = make_key(name, version, dict(params, lottery_type=lottery_type))
+
+        cls._sync_generation(partition)
+        found, value = cls._get_local(key)
+        if found:
+            return value
+
+        if not shared:
+            # 计算放在锁外，避免长耗时分析阻塞其他请求
+            value = compute()
+            cls._set_local(key, partition, value)
+            return value
+
+        try:
+            value = cls._get_or_compute_shared(key, partition, name, version, compute)
+        except Exception as e:
+            # 共享缓存出错时退化为进程内缓存，不影响接口
+            logger.warning(f"共享缓存读写失败: {e}")
+            value = compute()
+        cls._set_local(key, partition, value)
+        return value
+
+    @classmethod
+    def _get_or_compute_shared(cls, key, partition, name, version, compute):
+        store = cls.store
+        found, value = store.get(key)
+        if found:
+            return value
+
+        owner = store.acquire_lease(key)
+        if owner is None:
+            # 其他进程或线程正在计算，等待其结果
+            found, value = store.wait_for(key)
+            if found:
+                return value
+            return compute()
+
+        try:
+            value = compute()
+            store.set(key, partition, name, version, value)
+            return value
+        finally:
+            store.release_lease(key, owner)
+
+    @classmethod
+    def invalidate(cls, current_version=None, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """某彩种入库后调用：清除本进程该彩种的缓存，删除共享缓存中该彩种非当前版本的条目并通知其他进程"""
+        partition = str(lottery_type)
+        with cls._lock:
+            cls._drop_partition(partition)
+        try:
+            deleted = cls.store.invalidate(partition, current_version)
+            logger.info(f"分析缓存已失效: 彩种 {lottery_type} 删除 {deleted} 条旧版本结果")
+        except Exception as e:
+            logger.warning(f"共享缓存失效失败: {e}")
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
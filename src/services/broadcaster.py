@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from src.services.shared_cache import SharedCacheStore
+
+logger = logging.getLogger(__name__)
+
+# 每个订阅者最多积压的消息数，超出后丢弃最旧的消息并通知客户端重新同步
+MAX_BACKLOG = 32
+# 无消息时发送心跳的间隔（秒），防止代理或浏览器断开空闲连接
+HEARTBEAT_INTERVAL = 15
+# 检查其他进程发布的事件的间隔（秒）
+RELAY_INTERVAL = 1
+
+
+def format_event(event, data, event_id=None):
+    """编码为一条 SSE 消息"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    lines.extend(f'data: {line}' for line in payload.splitlines())
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    """单个客户端的有界消息队列"""
+
+    def __init__(self, backlog=MAX_BACKLOG):
+        self.messages = deque(maxlen=backlog)
+        self.dropped = 0
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def push(self, message):
+        with self._lock:
+            if len(self.messages) == self.messages.maxlen:
+                self.dropped += 1
+            self.messages.append(message)
+        self._ready.set()
+
+    def drain(self, timeout):
+        """等待最多 timeout 秒，返回 (积压的消息列表, 丢弃条数)；超时返回 ([], 0)"""
+        self._ready.wait(timeout)
+        with self._lock:
+            messages = list(self.messages)
+            dropped = self.dropped
+            self.messages.clear()
+            self.dropped = 0
+            self._ready.clear()
+        return messages, dropped
+
+
+class Broadcaster:
+    """事件广播：每条事件只编码一次，再分发到本进程所有订阅者的队列
+
+    订阅者只消费内存中的消息，不查询数据库，N 个客户端的开销与 1 个相同。
+    指定 store 时，发布的事件同时写入共享缓存库；有订阅者的进程在后台线程中每 RELAY_INTERVAL 秒
+    检查一次其他进程发布的事件并转发给本进程的订阅者，多 worker 部署时连接到任一 worker 的客户端都能收到推送。
+    """
+
+    def __init__(self, backlog=MAX_BACKLOG, store=None, relay_interval=RELAY_INTERVAL):
+        self.backlog = backlog
+        self.store = store
+        self.relay_interval = relay_interval
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._event_id = 0
+        self._relay_pid = None
+        self._relayed_id = 0
+
+    def subscribe(self):
+        subscription = Subscription(self.backlog)
+        with self._lock:
+            self._subscribers.add(subscription)
+        self._start_relay()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event, data):
+        """向本进程的订阅者发布事件，并写入共享缓存库供其他进程转发；返回本进程的订阅者数"""
+        receivers = self._publish_local(event, data)
+        if self.store is not None:
+            try:
+                self.store.append_event(self._origin(), event, data)
+            except Exception as e:
+                logger.warning(f"广播事件写入共享缓存失败: {e}")
+        return receivers
+
+    @staticmethod
+    def _origin():
+        return str(os.getpid())
+
+    def _start_relay(self):
+        """本进程首次有订阅者时启动转发线程（按进程号判断，fork 出的 worker 各自启动）"""
+        if self.store is None:
+            return
+        with self._lock:
+            if self._relay_pid == os.getpid():
+                return
+            try:
+                self._relayed_id = self.store.last_event_id()
+            except Exception as e:
+                logger.warning(f"共享缓存不可用，推送仅限本进程: {e}")
+                return
+            self._relay_pid = os.getpid()
+        threading.Thread(target=self._relay, name='event-relay', daemon=True).start()
+
+    def _relay(self):
+        """转发其他进程发布的事件"""
+        origin = self._origin()
+        while True:
+            time.sleep(self.relay_interval)
+            try:
+                events = self.store.events_after(self._relayed_id)
+            except Exception as e:
+                logger.warning(f"读取共享广播事件失败: {e}")
+                continue
+            for event_id, event_origin, event, data in events:
+                self._relayed_id = event_id
+                if event_origin != origin:
+                    self._publish_local(event, data)
+
+    def _publish_local(self, event, data):
+        with self._lock:
+            self._event_id += 1
+            message = format_event(event, data, self._event_id)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.push(message)
+        return len(subscribers)
+
+    def iter_events(self, subscription, first=None, heartbeat=HEARTBEAT_INTERVAL):
+        """SSE 响应体生成器：先发送 first，之后转发广播消息，空闲时发送心跳注释行
+
+        客户端断开时生成器被关闭，自动取消订阅。
+        """
+        try:
+            yield f'retry: {heartbeat * 1000}\n\n'
+            if first is not None:
+                yield first
+            while True:
+                messages, dropped = subscription.drain(heartbeat)
+                if dropped:
+                    # 积压溢出，客户端应重新加载完整数据
+                    yield format_event('resync', {'dropped': dropped})
+                if not messages:
+                    yield ': heartbeat\n\n'
+                    continue
+                yield ''.join(messages)
+        finally:
+            self.unsubscribe(subscription)
+
+
+# 开奖事件广播器，经共享缓存库在同一台机器的各 worker 之间转发
+draw_events = Broadcaster(store=SharedCacheStore())
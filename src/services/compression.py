@@ -0,0 +1,93 @@
+import gzip
+import brotli
+from flask import request
+
+# 小于该大小的响应不压缩（压缩收益抵不上额外的 CPU 开销和头部开销）
+MIN_COMPRESS_SIZE = 1024
+
+# 按内容大小选择压缩级别：(大小上限, gzip 级别, brotli 质量)
+# 小响应用较高级别换取更小体积；大响应降低级别，避免压缩耗时超过传输节省的时间
+COMPRESSION_LEVELS = [
+    (64 * 1024, 6, 6),
+    (1024 * 1024, 5, 4),
+    (None, 1, 1)
+]
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'application/x-ndjson',
+    'image/svg+xml',
+    'image/x-icon',
+    'image/vnd.microsoft.icon'
+}
+
+
+def is_compressible(mimetype):
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def accepted_encodings(accept_encoding):
+    """解析 Accept-Encoding，返回客户端接受的编码集合（忽略 q=0）"""
+    encodings = set()
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        params = params.replace(' ', '')
+        try:
+            quality = float(params[2:]) if params.startswith('q=') else 1.0
+        except ValueError:
+            quality = 0.0
+        if name and quality > 0:
+            encodings.add(name)
+    return encodings
+
+
+def choose_encoding(accept_encoding, available=('br', 'gzip')):
+    """按 brotli 优先、gzip 其次选择编码，都不接受时返回 None"""
+    encodings = accepted_encodings(accept_encoding)
+    for encoding in available:
+        if encoding in encodings or '*' in encodings:
+            return encoding
+    return None
+
+
+def compress(data, encoding, level=None):
+    """压缩数据；level 为空时按数据大小选择级别"""
+    if level is None:
+        size = len(data)
+        gzip_level, brotli_quality = next(
+            (g, b) for limit, g, b in COMPRESSION_LEVELS if limit is None or size <= limit
+        )
+        level = brotli_quality if encoding == 'br' else gzip_level
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_response(response):
+    """after_request 钩子：对超过阈值的文本类响应按 Accept-Encoding 压缩
+
+    流式响应（NDJSON 等）、已编码的响应和非 200 响应原样返回。
+    """
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or not is_compressible(response.mimetype or '')):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
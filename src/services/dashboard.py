@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from src.models.lottery import LotteryResult, PredictionResult
+from src.services.lottery_service import LotteryService
+from src.services.predictors import PredictorRegistry
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE, LOTTERY_TYPES
+
+# 各部分的计算只读取已加载的快照，不访问数据库，可以放在线程中并行执行
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='dashboard')
+
+
+class DashboardService:
+    """首页聚合数据：一次请求返回页面所需的统计、开奖结果、趋势分析和预测记录"""
+
+    RESULT_LIMIT = 20
+    PREDICTION_LIMIT = 5
+
+    @staticmethod
+    def load_snapshot(years=1, result_limit=RESULT_LIMIT, prediction_limit=PREDICTION_LIMIT,
+                      lottery_type=DEFAULT_LOTTERY_TYPE):
+        """在同一个只读事务内完成指定彩种的全部查询，各部分基于同一份数据快照计算
+
+        趋势分析窗口内的开奖记录只查询一次，最新开奖列表直接取其前若干条；
+        窗口内记录不足时才单独查询。
+        """
+        end_date = date.today()
+        start_date = end_date - timedelta(days=365 * years)
+
+        statistics = LotteryService.get_statistics(lottery_type)
+        window_results = LotteryResult.query.filter(
+            LotteryResult.type == lottery_type,
+            LotteryResult.lottery_date >= start_date
+        ).order_by(LotteryResult.lottery_date.desc()).all()
+
+        if len(window_results) >= result_limit or len(window_results) == statistics['total_results']:
+            latest_results = window_results[:result_limit]
+        else:
+            latest_results = LotteryResult.query.filter(
+                LotteryResult.type == lottery_type
+            ).order_by(LotteryResult.lottery_date.desc()).limit(result_limit).all()
+
+        predictions = PredictionResult.query.filter(
+            PredictionResult.lottery_type == lottery_type
+        ).order_by(PredictionResult.prediction_date.desc()).limit(prediction_limit).all()
+
+        return {
+            'lottery_type': lottery_type,
+            'years': years,
+            'start_date': start_date,
+            'end_date': end_date,
+            'statistics': statistics,
+            'window_results': window_results,
+            'latest_results': latest_results,
+            'predictions': predictions
+        }
+
+    @staticmethod
+    def get_dashboard(years=1, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """加载指定彩种的快照后并行计算各部分"""
+        snapshot = DashboardService.load_snapshot(years, lottery_type=lottery_type)
+        statistics = snapshot['statistics']
+
+        sections = {
+            'results': lambda: {
+                'list': [result.to_dict() for result in snapshot['latest_results']],
+                'total': statistics['total_results']
+            },
+            'trend_analysis': lambda: LotteryService.build_trend_analysis(
+                snapshot['window_results'], years, snapshot['start_date'], snapshot['end_date'], lottery_type
+            ),
+            'predictions': lambda: {
+                'list': [prediction.to_dict() for prediction in snapshot['predictions']],
+                'total': statistics['total_predictions']
+            },
+            'algorithms': lambda: PredictorRegistry.list_algorithms(lottery_type)
+        }
+        futures = {name: _executor.submit(compute) for name, compute in sections.items()}
+
+        dashboard = {
+            'statistics': statistics,
+            'lottery_types': [config.to_dict() for config in LOTTERY_TYPES.values()]
+        }
+        dashboard.update({name: future.result() for name, future in futures.items()})
+        return dashboard
@@ -0,0 +1,16 @@
+from sqlalchemy import func
+from src.models.lottery import db, LotteryResult
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE
+
+
+def get_data_version(lottery_type=DEFAULT_LOTTERY_TYPE):
+    """指定彩种开奖数据的版本号（记录数 + 最后更新时间），该彩种数据变化后版本随之变化
+
+    各彩种的版本互相独立，一个彩种入库不会使其他彩种的缓存和预测状态失效。
+    """
+    count, last_updated = db.session.query(
+        func.count(LotteryResult.id),
+        func.max(LotteryResult.updated_at)
+    ).filter(LotteryResult.type == lottery_type).one()
+    stamp = last_updated.strftime('%Y%m%d%H%M%S%f') if last_updated else '0'
+    return f"{count}-{stamp}"
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import numpy as np
+from src.models.lottery import db, LotteryResult, NumberFrequency
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE, get_lottery_type
+
+logger = logging.getLogger(__name__)
+
+# 每期出现的号码个数，用于计算稳态期望得分
+BALL_PICKS = {'red': 6, 'blue': 1}
+
+# 半衰期（期数）：一期开奖的权重经过这么多期后减半；可用环境变量 DECAY_HALF_LIVES=10,30,100 配置
+DEFAULT_HALF_LIVES = (10, 30, 100)
+
+
+def parse_half_lives(value):
+    """解析半衰期配置；未配置、含非整数或非正数时记录警告并使用默认值"""
+    try:
+        half_lives = tuple(int(x) for x in value.split(',') if x.strip())
+    except ValueError:
+        half_lives = None
+    if half_lives == ():
+        return DEFAULT_HALF_LIVES
+    if half_lives is None or any(h <= 0 for h in half_lives):
+        logger.warning(f"半衰期配置无效: {value!r}，应为正整数列表，使用默认值 {list(DEFAULT_HALF_LIVES)}")
+        return DEFAULT_HALF_LIVES
+    return half_lives
+
+
+HALF_LIVES = parse_half_lives(os.environ.get('DECAY_HALF_LIVES', ''))
+
+
+def decay_factors(half_lives):
+    """每期的衰减系数 0.5^(1/半衰期)"""
+    return 0.5 ** (1.0 / np.asarray(half_lives, dtype=np.float64))
+
+
+def expected_scores(half_lives=HALF_LIVES, lottery_type=DEFAULT_LOTTERY_TYPE):
+    """号码完全随机出现时的稳态期望得分 p/(1-λ)，用于判断得分偏高或偏低"""
+    factors = decay_factors(half_lives)
+    return {
+        ball_type: [round(float(x), 4) for x in BALL_PICKS[ball_type] / size / (1 - factors)]
+        for ball_type, size in get_lottery_type(lottery_type).ball_sizes.items()
+    }
+
+
+class DecayedFrequencyService:
+    """指数衰减频率得分：得分 = 得分×λ + 本期是否出现，λ 由半衰期决定
+
+    与按1/2/3年窗口计数不同，旧开奖的权重平滑衰减，不会在跨出窗口时突变。
+    每期新开奖只需更新该彩种全部号码的得分，不回扫历史；各彩种的得分分别保存。
+    """
+
+    @staticmethod
+    def _draw_rows(query):
+        return query.with_entities(
+            LotteryResult.issue_number,
+            LotteryResult.red_balls,
+            LotteryResult.blue_ball
+        ).order_by(LotteryResult.issue_number.asc()).all()
+
+    @staticmethod
+    def apply_draws(scores, rows, half_lives=HALF_LIVES):
+        """把开奖行依次计入得分（就地更新），每期 O(号码个数×半衰期个数)"""
+        factors = decay_factors(half_lives)
+        red, blue = scores['red'], scores['blue']
+        for _, red_balls, blue_ball in rows:
+            red *= factors
+            red[[int(x) - 1 for x in red_balls.split(',')]] += 1
+            blue *= factors
+            blue[blue_ball - 1] += 1
+        return scores
+
+    @staticmethod
+    def _load_records(lottery_type):
+        return {
+            (r.ball_type, r.number): r
+            for r in NumberFrequency.query.filter_by(lottery_type=lottery_type).all()
+        }
+
+    @staticmethod
+    def _scores_from_records(records, half_lives, lottery_type):
+        """从已持久化的记录还原得分矩阵（号码×半衰期）；缺失或半衰期配置变化时返回 None"""
+        scores = {}
+        for ball_type, size in get_lottery_type(lottery_type).ball_sizes.items():
+            matrix = np.zeros((size, len(half_lives)), dtype=np.float64)
+            for number in range(1, size + 1):
+                record = records.get((ball_type, number))
+                if record is None:
+                    return None
+                stored = record.get_decay_scores()
+                if set(stored) != set(half_lives):
+                    return None
+                matrix[number - 1] = [stored[h] for h in half_lives]
+            scores[ball_type] = matrix
+        return scores
+
+    @staticmethod
+    def sync_scores(half_lives=HALF_LIVES, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """把该彩种新入库的开奖计入衰减得分并保存到 NumberFrequency
+
+        只查询期号大于已计入期号的新记录；首次计算、半衰期配置变化或回填了更早的历史时整体重建。
+        该彩种的 NumberFrequency 尚无记录时（尚未做频率统计）跳过。
+        """
+        records = DecayedFrequencyService._load_records(lottery_type)
+        if not records:
+            return None
+
+        half_lives = tuple(half_lives)
+        sizes = get_lottery_type(lottery_type).ball_sizes
+        scores = DecayedFrequencyService._scores_from_records(records, half_lives, lottery_type)
+        markers = {(r.decay_issue, r.decay_draws or 0) for r in records.values()}
+        type_query = LotteryResult.query.filter(LotteryResult.type == lottery_type)
+        total = type_query.count()
+
+        new_rows = None
+        if scores is not None and len(markers) == 1:
+            last_issue, applied = markers.pop()
+            query = type_query
+            if last_issue:
+                query = query.filter(LotteryResult.issue_number > last_issue)
+            new_rows = DecayedFrequencyService._draw_rows(query)
+            # 总数对不上说明有旧数据被回填，只能重建
+            if applied + len(new_rows) != total:
+                new_rows = None
+            elif not new_rows:
+                return scores
+
+        mode = '增量更新'
+        if new_rows is None:
+            mode = '重建'
+            scores = {ball_type: np.zeros((size, len(half_lives))) for ball_type, size in sizes.items()}
+            new_rows = DecayedFrequencyService._draw_rows(type_query)
+
+        DecayedFrequencyService.apply_draws(scores, new_rows, half_lives)
+        last_issue = new_rows[-1][0] if new_rows else None
+
+        for (ball_type, number), record in records.items():
+            if ball_type not in scores or number > sizes[ball_type]:
+                continue
+            record.decay_scores = json.dumps({
+                str(h): round(float(v), 6) for h, v in zip(half_lives, scores[ball_type][number - 1])
+            })
+            record.decay_issue = last_issue
+            record.decay_draws = total
+
+        try:
+            db.session.commit()
+            logger.info(f"衰减频率得分{mode}完成: 彩种 {lottery_type}, {len(new_rows)} 期")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"衰减频率得分更新失败: {e}")
+        return scores
+
+    @staticmethod
+    def score_vectors(half_lives=HALF_LIVES, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """供预测算法使用的得分向量：{'half_lives', 'red': 红球个数×H, 'blue': 蓝球个数×H, 'expected'}"""
+        half_lives = tuple(half_lives)
+        scores = DecayedFrequencyService._scores_from_records(
+            DecayedFrequencyService._load_records(lottery_type), half_lives, lottery_type
+        )
+        if scores is None:
+            scores = DecayedFrequencyService.sync_scores(half_lives, lottery_type)
+        if scores is None:
+            return None
+        return dict(scores, half_lives=list(half_lives), expected=expected_scores(half_lives, lottery_type))
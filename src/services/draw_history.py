@@ -0,0 +1,91 @@
+import numpy as np
+from src.models.lottery import db, LotteryResult
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE, get_lottery_type
+
+
+def numbers_to_mask(numbers):
+    """号码集合转为位掩码（bit j 表示号码 j+1）"""
+    mask = 0
+    for number in numbers:
+        mask |= 1 << (int(number) - 1)
+    return mask
+
+
+def mask_to_numbers(mask):
+    """位掩码还原为升序号码列表"""
+    mask = int(mask)
+    return [bit + 1 for bit in range(mask.bit_length()) if mask >> bit & 1]
+
+
+class DrawHistory:
+    """某一彩种开奖历史的数组快照（按开奖日期升序排列）"""
+
+    def __init__(self, issues, dates, reds, blues, lottery_type=DEFAULT_LOTTERY_TYPE):
+        self.issues = issues            # 期号列表
+        self.dates = dates              # 开奖日期列表 (date)
+        self.reds = reds                # N×6 红球矩阵 (int16)
+        self.blues = blues              # 长度N的蓝球向量 (int16)
+        self.lottery_type = get_lottery_type(lottery_type)
+        self.red_count = self.lottery_type.red_count
+        self.blue_count = self.lottery_type.blue_count
+
+    def __len__(self):
+        return len(self.issues)
+
+    @classmethod
+    def from_rows(cls, rows, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """从 (issue_number, lottery_date, red_balls, blue_ball) 行构建，行需按日期升序"""
+        issues = [row[0] for row in rows]
+        dates = [row[1] for row in rows]
+        # 与 LotteryResult.get_red_balls_list 相同的解析方式
+        reds = np.array([[int(x) for x in row[2].split(',')] for row in rows],
+                        dtype=np.int16).reshape(len(rows), 6)
+        blues = np.array([row[3] for row in rows], dtype=np.int16)
+        return cls(issues, dates, reds, blues, lottery_type)
+
+    @classmethod
+    def from_results(cls, results, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """从同一彩种的 LotteryResult 对象列表构建（任意顺序）"""
+        ordered = sorted(results, key=lambda r: (r.lottery_date, r.issue_number))
+        return cls.from_rows([
+            (r.issue_number, r.lottery_date, r.red_balls, r.blue_ball) for r in ordered
+        ], lottery_type)
+
+    @classmethod
+    def load(cls, start_date=None, end_date=None, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """只查询所需的列，加载指定彩种、指定日期范围内的开奖历史（走 type+开奖日期 索引）"""
+        query = db.session.query(
+            LotteryResult.issue_number,
+            LotteryResult.lottery_date,
+            LotteryResult.red_balls,
+            LotteryResult.blue_ball
+        ).filter(LotteryResult.type == lottery_type)
+        if start_date:
+            query = query.filter(LotteryResult.lottery_date >= start_date)
+        if end_date:
+            query = query.filter(LotteryResult.lottery_date <= end_date)
+        rows = query.order_by(LotteryResult.lottery_date.asc(), LotteryResult.issue_number.asc()).all()
+        return cls.from_rows(rows, lottery_type)
+
+    def red_hits(self):
+        """N×红球个数 的红球命中矩阵，第 j 列表示号码 j+1 是否出现"""
+        hits = np.zeros((len(self), self.red_count), dtype=np.int32)
+        if len(self):
+            np.put_along_axis(hits, self.reds.astype(np.intp) - 1, 1, axis=1)
+        return hits
+
+    def red_masks(self):
+        """每期红球的 uint64 位掩码（bit j 表示号码 j+1），可直接做与运算和 popcount"""
+        bits = np.left_shift(np.uint64(1), (self.reds.astype(np.int64) - 1).astype(np.uint64))
+        return np.bitwise_or.reduce(bits, axis=1)
+
+    def date_array(self):
+        """开奖日期的 datetime64[D] 数组（升序），可用 searchsorted 按日期截取"""
+        return np.array(self.dates, dtype='datetime64[D]')
+
+    def blue_hits(self):
+        """N×蓝球个数 的蓝球命中矩阵"""
+        hits = np.zeros((len(self), self.blue_count), dtype=np.int32)
+        if len(self):
+            hits[np.arange(len(self)), self.blues.astype(np.intp) - 1] = 1
+        return hits
@@ -0,0 +1,103 @@
+import math
+from src.models.lottery import db
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE
+
+# 列表接口的轻量读取路径：直接在当前会话的连接上执行固定 SQL，只取响应需要的列，
+# 不构建 ORM 实例。SQLite 中日期本身以 ISO 字符串存储，时间列在 SQL 中截取到秒，
+# 与 to_dict() 的输出格式一致，Python 侧不再逐行 strftime。
+# SQL 文本是模块常量，sqlite3 按 SQL 文本缓存已编译的语句，连接池中的连接跨请求复用同一份预编译语句。
+# 所有查询都以彩种为条件，走 (type, lottery_date) / lottery_type 索引，不扫描其他彩种的记录。
+
+RESULT_COLUMNS = (
+    'id', 'original_id', 'type', 'type_name', 'issue_number', 'lottery_date',
+    'week', 'win_code', 'red_balls', 'blue_ball', 'created_at', 'updated_at'
+)
+_RESULT_SELECT = (
+    "SELECT id, original_id, type, type_name, issue_number, lottery_date, week, win_code, "
+    "red_balls, blue_ball, substr(created_at, 1, 19), substr(updated_at, 1, 19) FROM lottery_results"
+)
+RESULTS_SQL = _RESULT_SELECT + " WHERE type = ? ORDER BY lottery_date DESC LIMIT ? OFFSET ?"
+RESULTS_SINCE_SQL = (
+    _RESULT_SELECT + " WHERE type = ? AND lottery_date >= ? ORDER BY lottery_date DESC LIMIT ? OFFSET ?"
+)
+RESULTS_COUNT_SQL = "SELECT COUNT(*) FROM lottery_results WHERE type = ?"
+RESULTS_SINCE_COUNT_SQL = "SELECT COUNT(*) FROM lottery_results WHERE type = ? AND lottery_date >= ?"
+
+PREDICTION_COLUMNS = (
+    'id', 'lottery_type', 'prediction_date', 'predicted_issue', 'predicted_red_balls', 'predicted_blue_ball',
+    'predicted_win_code', 'algorithm_used', 'confidence_score', 'actual_win_code',
+    'matches_count', 'is_accurate', 'created_at', 'updated_at'
+)
+PREDICTIONS_SQL = (
+    "SELECT id, lottery_type, prediction_date, predicted_issue, predicted_red_balls, predicted_blue_ball, "
+    "predicted_win_code, algorithm_used, confidence_score, actual_win_code, matches_count, "
+    "is_accurate, substr(created_at, 1, 19), substr(updated_at, 1, 19) FROM prediction_results "
+    "WHERE lottery_type = ? ORDER BY prediction_date DESC LIMIT ? OFFSET ?"
+)
+PREDICTIONS_COUNT_SQL = "SELECT COUNT(*) FROM prediction_results WHERE lottery_type = ?"
+
+DEFAULT_PER_PAGE = 20
+
+
+def _execute(sql, params):
+    """在会话当前事务的连接上执行（只读请求即只读连接上的同一快照），返回元组列表"""
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _page_args(page, limit):
+    """与 paginate(error_out=False) 相同的页码修正"""
+    page = page if page >= 1 else 1
+    limit = limit if limit >= 1 else DEFAULT_PER_PAGE
+    return page, limit
+
+
+def pagination_info(page, limit, total):
+    """生成与 Flask-SQLAlchemy 分页对象一致的分页信息；page/limit 原样返回请求参数"""
+    current, per_page = _page_args(page, limit)
+    pages = math.ceil(total / per_page) if total else 0
+    return {
+        'page': page,
+        'limit': limit,
+        'total': total,
+        'pages': pages,
+        'has_next': current < pages,
+        'has_prev': current > 1
+    }
+
+
+class FastReads:
+    """/results、/predictions 的轻量查询，输出与模型 to_dict() 相同的字典"""
+
+    @staticmethod
+    def fetch_results(page=1, limit=20, start_date=None, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """返回指定彩种的 (当前页开奖字典列表, 总数)，start_date 为空时不按日期过滤"""
+        page, limit = _page_args(page, limit)
+        offset = (page - 1) * limit
+        if start_date:
+            since = start_date.isoformat()
+            rows = _execute(RESULTS_SINCE_SQL, (lottery_type, since, limit, offset))
+            total = _execute(RESULTS_SINCE_COUNT_SQL, (lottery_type, since))[0][0]
+        else:
+            rows = _execute(RESULTS_SQL, (lottery_type, limit, offset))
+            total = _execute(RESULTS_COUNT_SQL, (lottery_type,))[0][0]
+        columns = RESULT_COLUMNS
+        return [dict(zip(columns, row)) for row in rows], total
+
+    @staticmethod
+    def fetch_predictions(page=1, limit=10, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """返回指定彩种的 (当前页预测记录字典列表, 总数)"""
+        page, limit = _page_args(page, limit)
+        rows = _execute(PREDICTIONS_SQL, (lottery_type, limit, (page - 1) * limit))
+        total = _execute(PREDICTIONS_COUNT_SQL, (lottery_type,))[0][0]
+        columns = PREDICTION_COLUMNS
+        predictions = [dict(zip(columns, row)) for row in rows]
+        # SQLite 以 0/1 存储布尔值，转回布尔以保持响应不变
+        for prediction in predictions:
+            if prediction['is_accurate'] is not None:
+                prediction['is_accurate'] = bool(prediction['is_accurate'])
+        return predictions, total
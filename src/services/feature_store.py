@@ -0,0 +1,144 @@
+import logging
+import numpy as np
+from sqlalchemy import or_
+from src.models.lottery import db, LotteryResult, DrawFeature
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE, get_lottery_type
+
+logger = logging.getLogger(__name__)
+
+# 可用于检索的特征列
+FEATURE_COLUMNS = [
+    'red_sum', 'span', 'odd_count', 'big_count',
+    'zone1_count', 'zone2_count', 'zone3_count',
+    'consecutive_pairs', 'max_consecutive', 'ac_value',
+    'distinct_tails', 'blue_ball'
+] + [f'tail{digit}_count' for digit in range(10)]
+
+
+def compute_draw_features(reds, lottery_type=DEFAULT_LOTTERY_TYPE):
+    """对 N×6 红球矩阵一次性计算全部特征，返回 {特征名: 长度N的数组}
+
+    大小号、分区的界限按彩种的红球个数划分（双色球：17-33 为大号，一区 1-11，二区 12-22，三区 23-33）。
+    """
+    config = get_lottery_type(lottery_type)
+    big_threshold = config.big_threshold
+    zone_bounds = config.zone_bounds
+    reds = np.sort(np.asarray(reds, dtype=np.int16).reshape(-1, 6), axis=1)
+    total = len(reds)
+
+    # 连号：相邻差为1的位置；最长连号按列递推，N 行同时计算
+    adjacent = np.diff(reds, axis=1) == 1
+    run = np.zeros(total, dtype=np.int16)
+    longest = np.zeros(total, dtype=np.int16)
+    for col in range(adjacent.shape[1]):
+        run = np.where(adjacent[:, col], run + 1, 0)
+        longest = np.maximum(longest, run)
+
+    # AC值：15个两两差值中不同值的个数减5
+    i, j = np.triu_indices(6, k=1)
+    diffs = np.sort(reds[:, j] - reds[:, i], axis=1)
+    distinct_diffs = (np.diff(diffs, axis=1) != 0).sum(axis=1) + 1
+
+    # 尾数分布：N×10 计数矩阵
+    tails = np.zeros((total, 10), dtype=np.int16)
+    np.add.at(tails, (np.repeat(np.arange(total), 6), (reds % 10).ravel()), 1)
+
+    features = {
+        'red_sum': reds.sum(axis=1),
+        'span': reds[:, -1] - reds[:, 0],
+        'odd_count': (reds % 2).sum(axis=1),
+        'big_count': (reds >= big_threshold).sum(axis=1),
+        'zone1_count': (reds <= zone_bounds[0]).sum(axis=1),
+        'zone2_count': ((reds > zone_bounds[0]) & (reds <= zone_bounds[1])).sum(axis=1),
+        'zone3_count': (reds > zone_bounds[1]).sum(axis=1),
+        'consecutive_pairs': adjacent.sum(axis=1),
+        'max_consecutive': longest + 1,
+        'ac_value': distinct_diffs - 5,
+        'distinct_tails': (tails > 0).sum(axis=1),
+        'tail_counts': [''.join(map(str, row)) for row in tails.tolist()]
+    }
+    for digit in range(10):
+        features[f'tail{digit}_count'] = tails[:, digit]
+    return features
+
+
+class FeatureStore:
+    """开奖特征的计算、入库和检索"""
+
+    @staticmethod
+    def sync_features(lottery_type=DEFAULT_LOTTERY_TYPE):
+        """为该彩种缺少特征或号码、日期已变更的开奖计算特征，入库后调用；只处理需要更新的记录
+
+        特征表冗余了红球、蓝球和开奖日期供检索，三者任一与开奖记录不一致都视为过期。
+        """
+        rows = db.session.query(
+            LotteryResult.id,
+            LotteryResult.lottery_date,
+            LotteryResult.red_balls,
+            LotteryResult.blue_ball,
+            DrawFeature
+        ).outerjoin(
+            DrawFeature, DrawFeature.result_id == LotteryResult.id
+        ).filter(
+            LotteryResult.type == lottery_type,
+            or_(
+                DrawFeature.id.is_(None),
+                DrawFeature.red_balls != LotteryResult.red_balls,
+                DrawFeature.blue_ball != LotteryResult.blue_ball,
+                DrawFeature.lottery_date != LotteryResult.lottery_date
+            )
+        ).all()
+
+        if not rows:
+            return 0
+
+        features = compute_draw_features(
+            [[int(x) for x in row.red_balls.split(',')] for row in rows], lottery_type
+        )
+        for index, row in enumerate(rows):
+            record = row.DrawFeature or DrawFeature(result_id=row.id)
+            record.lottery_type = lottery_type
+            record.red_balls = row.red_balls
+            record.lottery_date = row.lottery_date
+            record.blue_ball = row.blue_ball
+            for name, values in features.items():
+                value = values[index]
+                setattr(record, name, value if isinstance(value, str) else int(value))
+            db.session.add(record)
+
+        try:
+            db.session.commit()
+            logger.info(f"开奖特征更新完成: 彩种 {lottery_type}, {len(rows)} 条")
+            return len(rows)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"开奖特征更新失败: {e}")
+            return 0
+
+    @staticmethod
+    def search(conditions, start_date=None, end_date=None, page=1, limit=20,
+               lottery_type=DEFAULT_LOTTERY_TYPE):
+        """按特征范围检索指定彩种的开奖，conditions 为 {特征名: (最小值, 最大值)}，两端均可为 None
+
+        条件直接落在带索引的特征列上，由 SQLite 走索引扫描，不加载开奖记录逐行计算。
+        """
+        query = DrawFeature.query.filter(DrawFeature.lottery_type == lottery_type)
+
+        for name, (low, high) in conditions.items():
+            column = getattr(DrawFeature, name)
+            if low is not None and low == high:
+                query = query.filter(column == low)
+                continue
+            if low is not None:
+                query = query.filter(column >= low)
+            if high is not None:
+                query = query.filter(column <= high)
+
+        if start_date:
+            query = query.filter(DrawFeature.lottery_date >= start_date)
+        if end_date:
+            query = query.filter(DrawFeature.lottery_date <= end_date)
+
+        return query.order_by(DrawFeature.lottery_date.desc()).paginate(
+            page=page, per_page=limit, error_out=False
+        )
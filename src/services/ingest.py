@@ -0,0 +1,101 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sqlalchemy import func
+from src.models.lottery import db, LotteryResult
+from src.models.database import serialized_write
+from src.services.lottery_service import LotteryService
+from src.services.markov import MarkovService
+from src.services.decayed_frequency import DecayedFrequencyService
+from src.services.feature_store import FeatureStore
+from src.services.data_version import get_data_version
+from src.services.analysis_cache import AnalysisCache
+from src.services.broadcaster import draw_events
+from src.services.lottery_types import LOTTERY_TYPES, get_lottery_type
+
+logger = logging.getLogger(__name__)
+
+# 各彩种的上游请求只涉及网络 I/O，在线程中并发执行；入库写操作仍逐个彩种串行
+_fetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ingest')
+
+
+class IngestService:
+    """入库流程：抓取保存开奖数据、刷新派生统计，有新开奖时向订阅者广播"""
+
+    @staticmethod
+    def run(max_pages=10, lottery_types=None):
+        """同步一个或多个彩种（默认全部已配置的彩种）
+
+        各彩种并发抓取，先抓取完成的彩种先入库；每个彩种只刷新自己的派生统计、
+        只失效自己的分析缓存。返回各彩种的结果及汇总。
+        """
+        type_ids = [get_lottery_type(t).type_id for t in lottery_types] if lottery_types else list(LOTTERY_TYPES)
+        futures = {
+            _fetch_executor.submit(LotteryService.fetch_all_pages, type_id, max_pages): type_id
+            for type_id in type_ids
+        }
+
+        results = {}
+        for future in as_completed(futures):
+            type_id = futures[future]
+            results[type_id] = IngestService._ingest(type_id, future.result())
+
+        ordered = [results[type_id] for type_id in type_ids]
+        return {
+            'saved_count': sum(r['saved_count'] for r in ordered),
+            'updated_count': sum(r['updated_count'] for r in ordered),
+            'total_records': sum(r['total_records'] for r in ordered),
+            'new_issues': [issue for r in ordered for issue in r['new_issues']],
+            'types': ordered
+        }
+
+    @staticmethod
+    def _ingest(lottery_type, items):
+        """保存一个彩种抓取到的数据并刷新该彩种的派生统计"""
+        # 入库操作串行执行，读接口走只读连接，不受写入阻塞
+        with serialized_write():
+            last_id = db.session.query(func.max(LotteryResult.id)).scalar() or 0
+
+            # 保存数据
+            saved, updated = LotteryService.save_lottery_results(items) if items else (0, 0)
+
+            # 更新频率统计
+            LotteryService.update_number_frequency(lottery_type)
+
+            # 把新开奖计入衰减频率得分
+            DecayedFrequencyService.sync_scores(lottery_type=lottery_type)
+
+            # 增量更新马尔可夫转移矩阵
+            MarkovService.sync_state(lottery_type)
+
+            # 计算新开奖的特征
+            FeatureStore.sync_features(lottery_type)
+
+            new_draws = LotteryResult.query.filter(
+                LotteryResult.type == lottery_type,
+                LotteryResult.id > last_id
+            ).order_by(LotteryResult.lottery_date.asc()).all() if saved else []
+            version = get_data_version(lottery_type)
+            total = db.session.query(func.count(LotteryResult.id)).filter(
+                LotteryResult.type == lottery_type
+            ).scalar()
+
+        if saved or updated:
+            # 清除该彩种旧版本的分析结果，其他 worker 随之丢弃进程内缓存
+            AnalysisCache.invalidate(version, lottery_type=lottery_type)
+
+        if new_draws:
+            receivers = draw_events.publish('draws', {
+                'lottery_type': lottery_type,
+                'version': version,
+                'draws': [draw.to_dict() for draw in new_draws]
+            })
+            logger.info(f"新开奖推送完成: 彩种 {lottery_type} {len(new_draws)} 期, 订阅者 {receivers} 个")
+
+        return {
+            'lottery_type': lottery_type,
+            'saved_count': saved,
+            'updated_count': updated,
+            'total_records': total,
+            'version': version,
+            'new_issues': [draw.issue_number for draw in new_draws]
+        }
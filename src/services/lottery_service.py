@@ -4,6 +4,10 @@ from datetime import datetime, date, timedelta
 from src.models.lottery import db, LotteryResult, NumberFrequency, PredictionResult
 from sqlalchemy import and_, or_, func
 from collections import Counter
+from src.services.draw_history import DrawHistory
+from src.services.number_trends import NumberTrendService
+from src.services.analysis_cache import AnalysisCache
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE, get_lottery_type
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -14,7 +18,7 @@ class LotteryService:
     API_BASE_URL = "https://gdwechat.daguoxiaoxian.com/api/lottery-results/list"
     
     @staticmethod
-    def fetch_lottery_data(type_id=1, limit=30, page=1):
+    def fetch_lottery_data(type_id=DEFAULT_LOTTERY_TYPE, limit=30, page=1):
         """从API获取六合彩数据"""
         headers = {
             'Accept': '*/*',
@@ -65,17 +69,22 @@ class LotteryService:
                 lottery_date = datetime.strptime(item['lottery_date'], '%Y-%m-%d').date()
                 
                 if existing:
-                    # 更新现有记录
-                    existing.type = item['type']
-                    existing.type_name = item['type_name']
-                    existing.issue_number = item['issue_number']
-                    existing.lottery_date = lottery_date
-                    existing.week = item['week']
-                    existing.win_code = item['win_code']
-                    existing.red_balls = red_balls
-                    existing.blue_ball = blue_ball
-                    existing.updated_at = datetime.utcnow()
-                    updated_count += 1
+                    # 更新现有记录（仅在内容变化时更新，避免无谓地改变数据版本）
+                    changes = {
+                        'type': item['type'],
+                        'type_name': item['type_name'],
+                        'issue_number': item['issue_number'],
+                        'lottery_date': lottery_date,
+                        'week': item['week'],
+                        'win_code': item['win_code'],
+                        'red_balls': red_balls,
+                        'blue_ball': blue_ball
+                    }
+                    if any(getattr(existing, field) != value for field, value in changes.items()):
+                        for field, value in changes.items():
+                            setattr(existing, field, value)
+                        existing.updated_at = datetime.utcnow()
+                        updated_count += 1
                 else:
                     # 创建新记录
                     new_result = LotteryResult(
@@ -106,28 +115,26 @@ class LotteryService:
             return 0, 0
     
     @staticmethod
-    def fetch_and_save_all_data(max_pages=100):
-        """获取并保存所有可用数据"""
-        total_saved = 0
-        total_updated = 0
+    def fetch_all_pages(type_id=DEFAULT_LOTTERY_TYPE, max_pages=100):
+        """逐页获取指定彩种的数据，只访问上游接口、不访问数据库（可在线程中并发执行）"""
+        items = []
         page = 1
         
         while page <= max_pages:
-            logger.info(f"正在获取第 {page} 页数据...")
-            data = LotteryService.fetch_lottery_data(page=page, limit=100)
+            logger.info(f"正在获取彩种 {type_id} 第 {page} 页数据...")
+            data = LotteryService.fetch_lottery_data(type_id=type_id, page=page, limit=100)
             
             if not data or data.get('code') != 1:
-                logger.warning(f"第 {page} 页数据获取失败或无数据")
+                logger.warning(f"彩种 {type_id} 第 {page} 页数据获取失败或无数据")
                 break
                 
             data_list = data.get('data', {}).get('list', [])
             if not data_list:
-                logger.info(f"第 {page} 页无数据，停止获取")
+                logger.info(f"彩种 {type_id} 第 {page} 页无数据，停止获取")
                 break
             
-            saved, updated = LotteryService.save_lottery_results(data_list)
-            total_saved += saved
-            total_updated += updated
+            # 只保留请求的彩种，避免上游返回的其他彩种混入
+            items.extend(item for item in data_list if str(item.get('type')) == str(type_id))
             
             page += 1
             
@@ -135,13 +142,23 @@ class LotteryService:
             if len(data_list) < 100:
                 break
         
-        logger.info(f"数据获取完成: 总共新增 {total_saved} 条, 更新 {total_updated} 条")
+        return items
+    
+    @staticmethod
+    def fetch_and_save_all_data(max_pages=100, type_id=DEFAULT_LOTTERY_TYPE):
+        """获取并保存指定彩种所有可用数据"""
+        items = LotteryService.fetch_all_pages(type_id=type_id, max_pages=max_pages)
+        total_saved, total_updated = LotteryService.save_lottery_results(items) if items else (0, 0)
+        
+        logger.info(f"彩种 {type_id} 数据获取完成: 总共新增 {total_saved} 条, 更新 {total_updated} 条")
         return total_saved, total_updated
     
     @staticmethod
-    def update_number_frequency():
-        """更新号码频率统计"""
-        logger.info("开始更新号码频率统计...")
+    def update_number_frequency(lottery_type=DEFAULT_LOTTERY_TYPE):
+        """更新指定彩种的号码频率统计（号码范围按彩种配置，只读取该彩种的开奖记录）"""
+        logger.info(f"开始更新彩种 {lottery_type} 的号码频率统计...")
+        config = get_lottery_type(lottery_type)
+        type_query = LotteryResult.query.filter(LotteryResult.type == lottery_type)
         
         # 获取时间节点
         now = date.today()
@@ -149,11 +166,15 @@ class LotteryService:
         two_years_ago = now - timedelta(days=730)
         three_years_ago = now - timedelta(days=1095)
         
-        # 清空现有频率数据
-        NumberFrequency.query.delete()
+        # 原地更新已有记录（保留衰减得分等增量维护的列），缺少的号码再新建
+        existing = {
+            (f.ball_type, f.number): f
+            for f in NumberFrequency.query.filter_by(lottery_type=lottery_type).all()
+        }
+        results = type_query.all()
         
-        # 统计红球频率 (1-33)
-        for number in range(1, 34):
+        # 统计红球频率
+        for number in range(1, config.red_count + 1):
             # 统计总频率
             total_freq = 0
             freq_1year = 0
@@ -161,8 +182,7 @@ class LotteryService:
             freq_3year = 0
             last_appeared = None
             
-            # 查询包含该号码的所有记录
-            results = LotteryResult.query.all()
+            # 遍历该彩种的所有记录
             for result in results:
                 red_balls = result.get_red_balls_list()
                 if number in red_balls:
@@ -182,55 +202,53 @@ class LotteryService:
             days_since_last = (now - last_appeared).days if last_appeared else 9999
             
             # 保存红球频率
-            freq_record = NumberFrequency(
-                number=number,
-                ball_type='red',
-                frequency=total_freq,
-                frequency_1year=freq_1year,
-                frequency_2year=freq_2year,
-                frequency_3year=freq_3year,
-                last_appeared=last_appeared,
-                days_since_last=days_since_last
+            freq_record = existing.get(('red', number)) or NumberFrequency(
+                lottery_type=lottery_type, number=number, ball_type='red'
             )
+            freq_record.frequency = total_freq
+            freq_record.frequency_1year = freq_1year
+            freq_record.frequency_2year = freq_2year
+            freq_record.frequency_3year = freq_3year
+            freq_record.last_appeared = last_appeared
+            freq_record.days_since_last = days_since_last
             db.session.add(freq_record)
         
-        # 统计蓝球频率 (1-16)
-        for number in range(1, 17):
+        # 统计蓝球频率
+        for number in range(1, config.blue_count + 1):
             # 统计总频率
-            total_freq = LotteryResult.query.filter_by(blue_ball=number).count()
-            freq_1year = LotteryResult.query.filter(
+            total_freq = type_query.filter_by(blue_ball=number).count()
+            freq_1year = type_query.filter(
                 and_(LotteryResult.blue_ball == number, LotteryResult.lottery_date >= one_year_ago)
             ).count()
-            freq_2year = LotteryResult.query.filter(
+            freq_2year = type_query.filter(
                 and_(LotteryResult.blue_ball == number, LotteryResult.lottery_date >= two_years_ago)
             ).count()
-            freq_3year = LotteryResult.query.filter(
+            freq_3year = type_query.filter(
                 and_(LotteryResult.blue_ball == number, LotteryResult.lottery_date >= three_years_ago)
             ).count()
             
             # 获取最后出现时间
-            last_result = LotteryResult.query.filter_by(blue_ball=number).order_by(
+            last_result = type_query.filter_by(blue_ball=number).order_by(
                 LotteryResult.lottery_date.desc()
             ).first()
             last_appeared = last_result.lottery_date if last_result else None
             days_since_last = (now - last_appeared).days if last_appeared else 9999
             
             # 保存蓝球频率
-            freq_record = NumberFrequency(
-                number=number,
-                ball_type='blue',
-                frequency=total_freq,
-                frequency_1year=freq_1year,
-                frequency_2year=freq_2year,
-                frequency_3year=freq_3year,
-                last_appeared=last_appeared,
-                days_since_last=days_since_last
+            freq_record = existing.get(('blue', number)) or NumberFrequency(
+                lottery_type=lottery_type, number=number, ball_type='blue'
             )
+            freq_record.frequency = total_freq
+            freq_record.frequency_1year = freq_1year
+            freq_record.frequency_2year = freq_2year
+            freq_record.frequency_3year = freq_3year
+            freq_record.last_appeared = last_appeared
+            freq_record.days_since_last = days_since_last
             db.session.add(freq_record)
         
         try:
             db.session.commit()
-            logger.info("号码频率统计更新完成")
+            logger.info(f"彩种 {lottery_type} 号码频率统计更新完成")
             return True
         except Exception as e:
             db.session.rollback()
@@ -238,16 +256,25 @@ class LotteryService:
             return False
     
     @staticmethod
-    def get_trend_analysis(years=1):
-        """获取趋势分析数据"""
+    def get_trend_analysis(years=1, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """获取指定彩种的趋势分析数据（按该彩种的数据版本缓存，所有 worker 共享）"""
         end_date = date.today()
         start_date = end_date - timedelta(days=365 * years)
         
-        # 获取指定时间范围内的数据
-        results = LotteryResult.query.filter(
-            LotteryResult.lottery_date >= start_date
-        ).order_by(LotteryResult.lottery_date.desc()).all()
+        def compute():
+            # 获取指定时间范围内的数据
+            results = LotteryResult.query.filter(
+                LotteryResult.type == lottery_type,
+                LotteryResult.lottery_date >= start_date
+            ).order_by(LotteryResult.lottery_date.desc()).all()
+            return LotteryService.build_trend_analysis(results, years, start_date, end_date, lottery_type)
         
+        params = {'years': years, 'end_date': end_date.isoformat()}
+        return AnalysisCache.get_or_compute('trend_analysis', params, compute, lottery_type=lottery_type)
+    
+    @staticmethod
+    def build_trend_analysis(results, years, start_date, end_date, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """根据已加载的同一彩种开奖记录（按日期倒序）计算趋势分析，不再查询数据库"""
         if not results:
             return None
         
@@ -296,26 +323,77 @@ class LotteryService:
             for result in recent_results
         ]
         
+        # 号码滑动窗口走势（复用已加载的数据）
+        trends = NumberTrendService.compute_number_trends(DrawHistory.from_results(results, lottery_type))
+        if trends:
+            analysis['number_trends'] = trends['series']
+            analysis['number_trend_labels'] = trends['labels']
+        
         return analysis
     
     @staticmethod
-    def get_latest_issue():
-        """获取最新期号"""
-        latest = LotteryResult.query.order_by(LotteryResult.lottery_date.desc()).first()
+    def get_statistics(lottery_type=DEFAULT_LOTTERY_TYPE):
+        """获取指定彩种的统计信息：开奖总数和日期范围用一次聚合查询得到"""
+        total_results, oldest_date, latest_date = db.session.query(
+            func.count(LotteryResult.id),
+            func.min(LotteryResult.lottery_date),
+            func.max(LotteryResult.lottery_date)
+        ).filter(LotteryResult.type == lottery_type).one()
+        latest_issue = db.session.query(LotteryResult.issue_number).filter(
+            LotteryResult.type == lottery_type,
+            LotteryResult.lottery_date == latest_date
+        ).order_by(LotteryResult.issue_number.desc()).limit(1).scalar() if latest_date else None
+        total_predictions = db.session.query(func.count(PredictionResult.id)).filter(
+            PredictionResult.lottery_type == lottery_type
+        ).scalar()
+        
+        # 计算数据覆盖的时间范围
+        date_range = None
+        if latest_date and oldest_date:
+            date_range = {
+                'start': oldest_date.strftime('%Y-%m-%d'),
+                'end': latest_date.strftime('%Y-%m-%d'),
+                'days': (latest_date - oldest_date).days
+            }
+        
+        return {
+            'lottery_type': get_lottery_type(lottery_type).to_dict(),
+            'total_results': total_results,
+            'total_predictions': total_predictions,
+            'date_range': date_range,
+            'latest_issue': latest_issue,
+            'latest_date': latest_date.strftime('%Y-%m-%d') if latest_date else None
+        }
+    
+    @staticmethod
+    def get_latest_issue(lottery_type=DEFAULT_LOTTERY_TYPE):
+        """获取指定彩种的最新期号"""
+        latest = LotteryResult.query.filter(
+            LotteryResult.type == lottery_type
+        ).order_by(LotteryResult.lottery_date.desc()).first()
         return latest.issue_number if latest else None
 
 
 
     @staticmethod
-    def get_consecutive_and_span_analysis(years=1):
-        """获取连号和跨度分析数据"""
+    def get_consecutive_and_span_analysis(years=1, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """获取指定彩种的连号和跨度分析数据（按该彩种的数据版本缓存，所有 worker 共享）"""
         end_date = date.today()
         start_date = end_date - timedelta(days=365 * years)
         
-        results = LotteryResult.query.filter(
-            LotteryResult.lottery_date >= start_date
-        ).order_by(LotteryResult.lottery_date.desc()).all()
+        def compute():
+            results = LotteryResult.query.filter(
+                LotteryResult.type == lottery_type,
+                LotteryResult.lottery_date >= start_date
+            ).order_by(LotteryResult.lottery_date.desc()).all()
+            return LotteryService.build_consecutive_and_span_analysis(results, years)
         
+        params = {'years': years, 'end_date': end_date.isoformat()}
+        return AnalysisCache.get_or_compute('consecutive_span_analysis', params, compute, lottery_type=lottery_type)
+    
+    @staticmethod
+    def build_consecutive_and_span_analysis(results, years):
+        """根据已加载的开奖记录计算连号和跨度分布"""
         if not results:
             return None
         
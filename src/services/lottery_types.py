@@ -0,0 +1,71 @@
+import os
+
+# 彩种配置：类型ID:名称:红球个数:蓝球个数，多个彩种以逗号分隔；类型ID即上游接口的 type 参数
+# 可用环境变量 LOTTERY_TYPES=1:双色球:33:16,2:其他彩种:35:12 配置，第一个为默认彩种
+DEFAULT_LOTTERY_TYPES = '1:双色球:33:16'
+
+# 红球位掩码使用 uint64，红球个数不能超过64
+MAX_RED_COUNT = 64
+
+
+class LotteryType:
+    """彩种：每期开出 6 个红球和 1 个蓝球（与开奖记录的存储格式一致），号码范围按彩种配置"""
+
+    RED_PICK = 6
+
+    def __init__(self, type_id, name, red_count, blue_count):
+        if not self.RED_PICK < red_count <= MAX_RED_COUNT or blue_count < 1:
+            raise ValueError(f'彩种 {type_id} 的号码范围无效: 红球 {red_count} 个, 蓝球 {blue_count} 个')
+        self.type_id = type_id
+        self.name = name
+        self.red_count = red_count
+        self.blue_count = blue_count
+
+    @property
+    def ball_sizes(self):
+        """{'red': 红球个数, 'blue': 蓝球个数}"""
+        return {'red': self.red_count, 'blue': self.blue_count}
+
+    @property
+    def big_threshold(self):
+        """大号的下限（红球后一半为大号，33 个红球时为 17-33）"""
+        return self.red_count // 2 + 1
+
+    @property
+    def zone_bounds(self):
+        """三分区的上界（33 个红球时为 1-11、12-22、23-33）"""
+        return round(self.red_count / 3), round(self.red_count * 2 / 3)
+
+    def to_dict(self):
+        return {
+            'type': self.type_id,
+            'name': self.name,
+            'red_count': self.red_count,
+            'blue_count': self.blue_count,
+            'red_pick': self.RED_PICK
+        }
+
+
+def parse_lottery_types(value):
+    types = {}
+    for entry in value.split(','):
+        if not entry.strip():
+            continue
+        type_id, name, red_count, blue_count = entry.split(':')
+        lottery_type = LotteryType(int(type_id), name.strip(), int(red_count), int(blue_count))
+        types[lottery_type.type_id] = lottery_type
+    return types
+
+
+LOTTERY_TYPES = parse_lottery_types(os.environ.get('LOTTERY_TYPES', '')) or parse_lottery_types(DEFAULT_LOTTERY_TYPES)
+DEFAULT_LOTTERY_TYPE = next(iter(LOTTERY_TYPES))
+
+
+def get_lottery_type(type_id=None):
+    """按类型ID取彩种配置，未指定时返回默认彩种；未配置的彩种抛出 ValueError"""
+    if type_id is None:
+        type_id = DEFAULT_LOTTERY_TYPE
+    try:
+        return LOTTERY_TYPES[int(type_id)]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f'未配置的彩种: {type_id}')
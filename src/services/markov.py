@@ -0,0 +1,191 @@
+import json
+import logging
+import numpy as np
+from src.models.lottery import db, LotteryResult, MarkovTransitionState
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE, get_lottery_type
+
+logger = logging.getLogger(__name__)
+
+# 每期出现的号码个数，用作平滑先验
+BALL_PICKS = {'red': 6, 'blue': 1}
+
+
+class _TransitionMatrix:
+    """内存中的转移计数矩阵"""
+
+    def __init__(self, lottery_type, ball_type, counts=None, totals=None, last_issue=None,
+                 last_numbers=None, transitions=0):
+        size = get_lottery_type(lottery_type).ball_sizes[ball_type]
+        self.lottery_type = lottery_type
+        self.ball_type = ball_type
+        self.size = size
+        self.counts = counts if counts is not None else np.zeros((size, size), dtype=np.int64)
+        self.totals = totals if totals is not None else np.zeros(size, dtype=np.int64)
+        self.last_issue = last_issue
+        self.last_numbers = last_numbers
+        self.transitions = transitions
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(
+            record.lottery_type,
+            record.ball_type,
+            counts=np.array(json.loads(record.counts), dtype=np.int64),
+            totals=np.array(json.loads(record.totals), dtype=np.int64),
+            last_issue=record.last_issue,
+            last_numbers=[int(x) for x in record.last_numbers.split(',')] if record.last_numbers else None,
+            transitions=record.transitions or 0
+        )
+
+    def copy(self):
+        return _TransitionMatrix(
+            self.lottery_type, self.ball_type, counts=self.counts.copy(), totals=self.totals.copy(),
+            last_issue=self.last_issue,
+            last_numbers=list(self.last_numbers) if self.last_numbers is not None else None,
+            transitions=self.transitions
+        )
+
+    def apply(self, issue, numbers):
+        """计入一期开奖：只更新上一期号码×本期号码对应的格子，与历史长度无关"""
+        if self.last_numbers is not None:
+            prev = np.array(self.last_numbers) - 1
+            cur = np.array(numbers) - 1
+            self.counts[np.ix_(prev, cur)] += 1
+            self.totals[prev] += 1
+            self.transitions += 1
+        self.last_issue = issue
+        self.last_numbers = list(numbers)
+
+    def probabilities(self):
+        """下一期各号码出现的概率：对上一期号码所在行做平滑归一后取平均（矩阵-向量乘积）"""
+        size = self.size
+        prior = BALL_PICKS[self.ball_type] / size
+        state = np.zeros(size)
+        if self.last_numbers:
+            state[np.array(self.last_numbers) - 1] = 1.0 / len(self.last_numbers)
+        else:
+            state[:] = 1.0 / size
+        transition = (self.counts + prior) / (self.totals + 1)[:, None]
+        return state @ transition
+
+    def save(self):
+        record = MarkovTransitionState.query.filter_by(
+            lottery_type=self.lottery_type, ball_type=self.ball_type
+        ).first()
+        if record is None:
+            record = MarkovTransitionState(lottery_type=self.lottery_type, ball_type=self.ball_type)
+            db.session.add(record)
+        record.counts = json.dumps(self.counts.tolist())
+        record.totals = json.dumps(self.totals.tolist())
+        record.last_issue = self.last_issue
+        record.last_numbers = ','.join(map(str, self.last_numbers)) if self.last_numbers else None
+        record.transitions = self.transitions
+
+
+class MarkovService:
+    """基于一阶转移矩阵的预测（每个彩种各自的红球、蓝球转移矩阵，双色球为33×33、16×16）"""
+
+    @staticmethod
+    def _draw_rows(query):
+        return query.with_entities(
+            LotteryResult.issue_number,
+            LotteryResult.red_balls,
+            LotteryResult.blue_ball
+        ).order_by(LotteryResult.issue_number.asc()).all()
+
+    @staticmethod
+    def _apply_rows(matrices, rows):
+        for issue, red_balls, blue_ball in rows:
+            matrices['red'].apply(issue, [int(x) for x in red_balls.split(',')])
+            matrices['blue'].apply(issue, [blue_ball])
+
+    @staticmethod
+    def load_matrices(lottery_type=DEFAULT_LOTTERY_TYPE):
+        """读取该彩种已持久化的转移矩阵，不存在或号码范围与配置不符时返回 None"""
+        records = {
+            r.ball_type: r for r in MarkovTransitionState.query.filter_by(lottery_type=lottery_type).all()
+        }
+        sizes = get_lottery_type(lottery_type).ball_sizes
+        if set(records) != set(sizes):
+            return None
+        matrices = {ball_type: _TransitionMatrix.from_record(r) for ball_type, r in records.items()}
+        if any(matrix.counts.shape != (matrix.size, matrix.size) for matrix in matrices.values()):
+            return None
+        return matrices
+
+    @staticmethod
+    def rebuild_state(lottery_type=DEFAULT_LOTTERY_TYPE):
+        """从该彩种的全部历史重建转移矩阵（仅在首次使用或历史数据被回填时执行）"""
+        matrices = {
+            ball_type: _TransitionMatrix(lottery_type, ball_type)
+            for ball_type in get_lottery_type(lottery_type).ball_sizes
+        }
+        MarkovService._apply_rows(matrices, MarkovService._draw_rows(
+            LotteryResult.query.filter(LotteryResult.type == lottery_type)
+        ))
+        for matrix in matrices.values():
+            matrix.save()
+        db.session.commit()
+        logger.info(f"马尔可夫转移矩阵重建完成: 彩种 {lottery_type}, {matrices['red'].transitions} 次转移")
+        return matrices
+
+    @staticmethod
+    def sync_state(lottery_type=DEFAULT_LOTTERY_TYPE):
+        """把该彩种新入库的开奖增量计入转移矩阵，每期 O(1)
+
+        只查询期号大于已计入期号的新记录；若总数对不上（例如回填了更早的历史），则整体重建。
+        """
+        matrices = MarkovService.load_matrices(lottery_type)
+        if matrices is None:
+            return MarkovService.rebuild_state(lottery_type)
+
+        red = matrices['red']
+        query = LotteryResult.query.filter(LotteryResult.type == lottery_type)
+        new_rows = MarkovService._draw_rows(
+            query.filter(LotteryResult.issue_number > red.last_issue)
+        ) if red.last_issue else []
+
+        applied = red.transitions + (1 if red.last_issue else 0)
+        if applied + len(new_rows) != query.count():
+            return MarkovService.rebuild_state(lottery_type)
+
+        if new_rows:
+            MarkovService._apply_rows(matrices, new_rows)
+            for matrix in matrices.values():
+                matrix.save()
+            db.session.commit()
+            logger.info(f"马尔可夫转移矩阵增量更新: 彩种 {lottery_type}, {len(new_rows)} 期")
+        return matrices
+
+    @staticmethod
+    def apply_in_memory(matrices, rows):
+        """把新开奖计入转移矩阵的副本并返回，不读写数据库；rows 为按期号升序的 (期号, 红球, 蓝球)
+
+        已计入的期号会被跳过；持久化仍由入库时的 sync_state 完成。
+        """
+        matrices = {ball_type: matrix.copy() for ball_type, matrix in matrices.items()}
+        last_issue = matrices['red'].last_issue
+        MarkovService._apply_rows(matrices, [row for row in rows if row[0] > last_issue])
+        return matrices
+
+    @staticmethod
+    def predict(matrices=None, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """用最新一期号码乘以转移矩阵，取概率最高的6个红球和1个蓝球"""
+        if matrices is None:
+            matrices = MarkovService.load_matrices(lottery_type) or MarkovService.rebuild_state(lottery_type)
+        if matrices['red'].last_numbers is None:
+            return None
+
+        red_probs = matrices['red'].probabilities()
+        blue_probs = matrices['blue'].probabilities()
+        red_order = np.argsort(-red_probs, kind='stable')[:6]
+        blue_best = int(np.argmax(blue_probs))
+
+        return {
+            'red_balls': sorted(int(i) + 1 for i in red_order),
+            'blue_ball': blue_best + 1,
+            'red_probabilities': {int(i) + 1: round(float(red_probs[i]), 4) for i in red_order},
+            'blue_probability': round(float(blue_probs[blue_best]), 4),
+            'transitions': matrices['red'].transitions,
+            'based_on_issue': matrices['red'].last_issue
+        }
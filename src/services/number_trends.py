@@ -0,0 +1,68 @@
+import numpy as np
+from src.services.draw_history import DrawHistory
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE
+
+
+class NumberTrendService:
+    """号码滑动窗口走势"""
+
+    DEFAULT_WINDOW = 10
+    DEFAULT_STEP = 1
+    DEFAULT_ALPHA = 0.3
+
+    @staticmethod
+    def compute_number_trends(history, window=DEFAULT_WINDOW, step=DEFAULT_STEP, alpha=DEFAULT_ALPHA):
+        """计算全部红球、蓝球号码的滑动窗口出现次数及指数平滑序列
+
+        对 N×号码总数 的命中矩阵做一次累加和，窗口计数即为两行累加和之差，
+        所有号码同时计算，不按号码循环。窗口终点与最新一期对齐。
+        """
+        total = len(history)
+        if total == 0 or window > total:
+            return None
+
+        hits = np.hstack([history.red_hits(), history.blue_hits()])
+        cumsum = np.zeros((total + 1, hits.shape[1]), dtype=np.int32)
+        np.cumsum(hits, axis=0, out=cumsum[1:])
+
+        ends = np.arange(total, window - 1, -step)[::-1]
+        counts = cumsum[ends] - cumsum[ends - window]  # P×号码总数
+
+        # 指数平滑：逐个时间点递推，所有号码列同时更新
+        smoothed = np.empty(counts.shape, dtype=np.float64)
+        smoothed[0] = counts[0]
+        for i in range(1, len(counts)):
+            smoothed[i] = alpha * counts[i] + (1 - alpha) * smoothed[i - 1]
+        smoothed = np.round(smoothed, 3)
+
+        red_count = history.red_count
+        series = []
+        for col in range(hits.shape[1]):
+            is_red = col < red_count
+            series.append({
+                'number': col + 1 if is_red else col - red_count + 1,
+                'ball_type': 'red' if is_red else 'blue',
+                'counts': counts[:, col].tolist(),
+                'smoothed': smoothed[:, col].tolist()
+            })
+
+        return {
+            'window': window,
+            'step': step,
+            'alpha': alpha,
+            'total_draws': total,
+            'labels': [history.issues[e - 1] for e in ends],
+            'dates': [history.dates[e - 1].strftime('%Y-%m-%d') for e in ends],
+            'expected': {
+                'red': round(window * 6 / red_count, 3),
+                'blue': round(window / history.blue_count, 3)
+            },
+            'series': series
+        }
+
+    @staticmethod
+    def get_number_trends(start_date=None, end_date=None, window=DEFAULT_WINDOW,
+                          step=DEFAULT_STEP, alpha=DEFAULT_ALPHA, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """加载指定彩种、指定日期范围内的历史并计算号码走势"""
+        history = DrawHistory.load(start_date=start_date, end_date=end_date, lottery_type=lottery_type)
+        return NumberTrendService.compute_number_trends(history, window=window, step=step, alpha=alpha)
@@ -0,0 +1,105 @@
+import numpy as np
+from src.services.draw_history import DrawHistory
+from src.services.analysis_cache import AnalysisCache
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE
+
+RED_PICK = 6
+
+
+def _distribution(values, size):
+    """0..size-1 各取值出现的次数"""
+    return np.bincount(values, minlength=size)[:size].tolist()
+
+
+class PositionAnalysisService:
+    """定位（按大小排序后的第1-6位红球）、尾数、重号、邻号分析"""
+
+    @staticmethod
+    def compute_position_analysis(history):
+        """对按行升序排序的 N×6 红球矩阵一次性计算全部统计
+
+        - 定位：6 个位置的号码分布合并为一次 bincount（位置 p 的号码偏移 p×(红球个数+1)）
+        - 尾数：号码 %10 的分布，以及每期不同尾数个数的分布
+        - 重号/邻号：相邻两期位掩码求与后 popcount，邻号为上一期号码 ±1 的位置
+        重号、邻号针对区间内相邻两期计算，第一期没有上一期，不参与统计。
+        """
+        total = len(history)
+        if total == 0:
+            return None
+
+        red_count = history.red_count
+        reds = np.sort(history.reds.astype(np.int64), axis=1)
+
+        # 定位分布：6×红球个数
+        offsets = np.arange(RED_PICK, dtype=np.int64) * (red_count + 1)
+        position_counts = np.bincount(
+            (reds + offsets).ravel(), minlength=RED_PICK * (red_count + 1)
+        ).reshape(RED_PICK, red_count + 1)[:, 1:]
+        means = reds.mean(axis=0)
+        positions = []
+        for p in range(RED_PICK):
+            counts = position_counts[p]
+            top = np.argsort(-counts, kind='stable')[:5]
+            positions.append({
+                'position': p + 1,
+                'counts': counts.tolist(),
+                'mean': round(float(means[p]), 2),
+                'min': int(reds[:, p].min()),
+                'max': int(reds[:, p].max()),
+                'most_common': [[int(i) + 1, int(counts[i])] for i in top if counts[i]]
+            })
+
+        # 尾数：全部红球的尾数分布 + 每期不同尾数个数
+        tails = reds % 10
+        tail_counts = np.bincount(tails.ravel(), minlength=10)
+        tail_hits = np.zeros((total, 10), dtype=np.int8)
+        np.put_along_axis(tail_hits, tails, 1, axis=1)
+        distinct_tails = tail_hits.sum(axis=1)
+        # 全部红球号码中各尾数的号码个数，用于计算理论期望
+        numbers_per_tail = np.bincount(np.arange(1, red_count + 1) % 10, minlength=10)
+        expected = numbers_per_tail * total * RED_PICK / red_count
+
+        # 重号、邻号：上一期与本期的位掩码；邻号去掉移位溢出到红球范围之外的位
+        masks = history.red_masks()
+        previous, current = masks[:-1], masks[1:]
+        red_mask = np.uint64((1 << red_count) - 1)
+        neighbours = ((previous << np.uint64(1)) | (previous >> np.uint64(1))) & red_mask
+        repeat_counts = np.bitwise_count(current & previous).astype(np.int64)
+        adjacent_counts = np.bitwise_count(current & neighbours).astype(np.int64)
+
+        def summary(counts):
+            return {
+                'distribution': _distribution(counts, RED_PICK + 1),
+                'average': round(float(counts.mean()), 3) if len(counts) else None,
+                'draws_with_any': int((counts > 0).sum())
+            }
+
+        return {
+            'total_draws': total,
+            'positions': positions,
+            'tails': {
+                'counts': tail_counts.tolist(),
+                'expected': np.round(expected, 2).tolist(),
+                'distinct_distribution': _distribution(distinct_tails, RED_PICK + 1)
+            },
+            'repeats': summary(repeat_counts),
+            'adjacent': summary(adjacent_counts),
+            'transitions': {
+                'labels': history.issues[1:],
+                'repeat_counts': repeat_counts.tolist(),
+                'adjacent_counts': adjacent_counts.tolist()
+            }
+        }
+
+    @staticmethod
+    def get_position_analysis(start_date=None, end_date=None, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """加载指定彩种、指定日期范围内的历史并计算，按该彩种的数据版本缓存"""
+        def compute():
+            history = DrawHistory.load(start_date=start_date, end_date=end_date, lottery_type=lottery_type)
+            return PositionAnalysisService.compute_position_analysis(history)
+
+        params = {
+            'start_date': start_date.isoformat() if start_date else None,
+            'end_date': end_date.isoformat() if end_date else None
+        }
+        return AnalysisCache.get_or_compute('position_analysis', params, compute, lottery_type=lottery_type)
@@ -0,0 +1,387 @@
+import random
+import threading
+import time
+import logging
+from collections import Counter, deque
+from datetime import datetime
+from src.models.lottery import db, LotteryResult, NumberFrequency
+from src.services.data_version import get_data_version
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE
+from src.services.markov import MarkovService
+from src.services.decayed_frequency import DecayedFrequencyService
+
+logger = logging.getLogger(__name__)
+
+RECENT_DRAWS = 20
+
+
+class PredictorRegistry:
+    """预测算法注册表
+
+    每个算法声明自己依赖的预计算状态；状态按数据版本构建一次，在所有算法之间共享。
+    数据版本变化时，若状态提供了增量更新函数，则只把新开奖计入，否则整体重建。
+    状态按彩种分别构建和保存，各彩种的数据版本互不影响。
+
+    由派生表（如 NumberFrequency）构建的状态另需声明来源标记：入库时开奖记录与派生表分别提交，
+    只按开奖数据版本缓存会把两次提交之间读到的旧派生数据记在新版本下，直到下一期入库才刷新。
+    """
+
+    _predictors = {}
+    _state_providers = {}
+    _states = {}    # (彩种, 状态名) -> 状态
+    _lock = threading.RLock()
+
+    @classmethod
+    def state(cls, name, update=None, marker=None):
+        """注册状态构建函数 build(彩种)；update(旧状态, 新开奖行, 彩种) 返回新状态，返回 None 表示需要重建；
+        marker(彩种) 返回来源派生表的更新标记，计入状态版本"""
+        def decorator(build):
+            cls._state_providers[name] = {'build': build, 'update': update, 'marker': marker}
+            return build
+        return decorator
+
+    @classmethod
+    def predictor(cls, name, label, confidence, requires=()):
+        """注册预测算法，函数接收 {状态名: 状态} 字典，返回预测结果"""
+        def decorator(func):
+            cls._predictors[name] = {
+                'func': func,
+                'label': label,
+                'confidence': confidence,
+                'requires': tuple(requires)
+            }
+            return func
+        return decorator
+
+    @classmethod
+    def names(cls):
+        return list(cls._predictors)
+
+    @staticmethod
+    def _history_marker(lottery_type):
+        """该彩种当前最新期号和总期数，用于判断增量更新是否可行"""
+        last_issue, count = db.session.query(
+            db.func.max(LotteryResult.issue_number),
+            db.func.count(LotteryResult.id)
+        ).filter(LotteryResult.type == lottery_type).one()
+        return last_issue, count
+
+    @classmethod
+    def get_state(cls, name, version=None, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """获取指定彩种的指定状态；同一数据版本（及来源标记）内直接复用"""
+        if version is None:
+            version = get_data_version(lottery_type)
+        provider = cls._state_providers[name]
+        if provider['marker']:
+            version = f"{version}:{provider['marker'](lottery_type)}"
+
+        with cls._lock:
+            entry = cls._states.get((lottery_type, name))
+            if entry and entry['version'] == version:
+                return entry['value']
+
+            started = time.perf_counter()
+            last_issue, count = cls._history_marker(lottery_type)
+            value = None
+            mode = 'build'
+
+            if entry and provider['update'] and entry['last_issue']:
+                new_rows = db.session.query(
+                    LotteryResult.issue_number,
+                    LotteryResult.lottery_date,
+                    LotteryResult.red_balls,
+                    LotteryResult.blue_ball
+                ).filter(
+                    LotteryResult.type == lottery_type,
+                    LotteryResult.issue_number > entry['last_issue']
+                ).order_by(LotteryResult.issue_number.asc()).all()
+                # 总数对不上说明有旧数据被回填，只能重建
+                if entry['count'] + len(new_rows) == count:
+                    value = provider['update'](entry['value'], new_rows, lottery_type)
+                    mode = 'update'
+
+            if value is None:
+                value = provider['build'](lottery_type)
+                mode = 'build'
+
+            cls._states[(lottery_type, name)] = {
+                'version': version,
+                'value': value,
+                'last_issue': last_issue,
+                'count': count,
+                'mode': mode,
+                'build_ms': round((time.perf_counter() - started) * 1000, 2),
+                'built_at': datetime.utcnow()
+            }
+            return value
+
+    @classmethod
+    def predict(cls, name, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """对指定彩种运行指定算法"""
+        predictor = cls._predictors[name]
+        version = get_data_version(lottery_type)
+        states = {state: cls.get_state(state, version, lottery_type) for state in predictor['requires']}
+        prediction = predictor['func'](states)
+        if prediction:
+            prediction.setdefault('confidence', predictor['confidence'])
+            prediction.setdefault('method', predictor['label'])
+        return prediction
+
+    @classmethod
+    def list_algorithms(cls, lottery_type=DEFAULT_LOTTERY_TYPE):
+        """列出已注册算法及其依赖状态在指定彩种下的构建信息"""
+        with cls._lock:
+            states = {
+                name: {
+                    'version': entry['version'],
+                    'mode': entry['mode'],
+                    'build_ms': entry['build_ms'],
+                    'built_at': entry['built_at'].strftime('%Y-%m-%d %H:%M:%S')
+                }
+                for (state_type, name), entry in cls._states.items() if state_type == lottery_type
+            }
+        return [
+            {
+                'name': name,
+                'label': predictor['label'],
+                'confidence': predictor['confidence'],
+                'requires': list(predictor['requires']),
+                'states': {state: states.get(state) for state in predictor['requires']}
+            }
+            for name, predictor in cls._predictors.items()
+        ]
+
+
+# ---------------------------------------------------------------------------
+# 预计算状态
+# ---------------------------------------------------------------------------
+
+def frequency_marker(lottery_type):
+    """NumberFrequency 的最后更新时间，频率统计重新计算后随之变化"""
+    updated_at = db.session.query(db.func.max(NumberFrequency.updated_at)).filter(
+        NumberFrequency.lottery_type == lottery_type
+    ).scalar()
+    return updated_at.strftime('%Y%m%d%H%M%S%f') if updated_at else '0'
+
+
+def decay_marker(lottery_type):
+    """已计入衰减得分的最新期号和期数"""
+    decay_issue, decay_draws = db.session.query(
+        db.func.max(NumberFrequency.decay_issue),
+        db.func.max(NumberFrequency.decay_draws)
+    ).filter(NumberFrequency.lottery_type == lottery_type).one()
+    return f"{decay_issue or '0'}-{decay_draws or 0}"
+
+
+@PredictorRegistry.state('frequency', marker=frequency_marker)
+def build_frequency_state(lottery_type):
+    """号码频率统计（来自 NumberFrequency，按频率、遗漏天数降序）"""
+    state = {}
+    for ball_type in ('red', 'blue'):
+        rows = NumberFrequency.query.filter_by(lottery_type=lottery_type, ball_type=ball_type).order_by(
+            NumberFrequency.frequency.desc(),
+            NumberFrequency.days_since_last.desc()
+        ).all()
+        state[ball_type] = [(f.number, f.frequency) for f in rows]
+    return state
+
+
+def _recent_entry(row):
+    return [int(x) for x in row.red_balls.split(',')], row.blue_ball
+
+
+def update_recent_state(state, new_rows, lottery_type):
+    """最近开奖窗口：追加新开奖，超出窗口的旧开奖自动移出"""
+    state = deque(state, maxlen=RECENT_DRAWS)
+    state.extend(_recent_entry(row) for row in new_rows)
+    return state
+
+
+@PredictorRegistry.state('recent', update=update_recent_state)
+def build_recent_state(lottery_type):
+    """最近 RECENT_DRAWS 期开奖（按时间升序）"""
+    rows = db.session.query(LotteryResult.red_balls, LotteryResult.blue_ball).filter(
+        LotteryResult.type == lottery_type
+    ).order_by(LotteryResult.lottery_date.desc()).limit(RECENT_DRAWS).all()
+    return deque((_recent_entry(row) for row in reversed(rows)), maxlen=RECENT_DRAWS)
+
+
+def update_markov_state(state, new_rows, lottery_type):
+    """在内存中把新开奖计入转移矩阵的副本，预测请求不写数据库；尚无已计入期号时重建"""
+    if not state['red'].last_issue:
+        return None
+    return MarkovService.apply_in_memory(
+        state, [(row.issue_number, row.red_balls, row.blue_ball) for row in new_rows]
+    )
+
+
+@PredictorRegistry.state('markov', update=update_markov_state)
+def build_markov_state(lottery_type):
+    """马尔可夫转移矩阵（持久化在数据库中，自身支持增量更新）"""
+    return MarkovService.sync_state(lottery_type)
+
+
+@PredictorRegistry.state(
+    'decayed_frequency',
+    update=lambda state, new_rows, lottery_type: DecayedFrequencyService.score_vectors(lottery_type=lottery_type),
+    marker=decay_marker
+)
+def build_decayed_frequency_state(lottery_type):
+    """衰减频率得分（持久化在 NumberFrequency 中，随入库增量更新）"""
+    return DecayedFrequencyService.score_vectors(lottery_type=lottery_type)
+
+
+# ---------------------------------------------------------------------------
+# 预测算法
+# ---------------------------------------------------------------------------
+
+@PredictorRegistry.predictor('frequency', '频率分析法', 0.6, requires=('frequency',))
+def predict_by_frequency(states):
+    """基于频率的预测算法"""
+    try:
+        frequency = states['frequency']
+
+        # 从前15个热号中随机选择6个
+        selected_red = random.sample([number for number, _ in frequency['red'][:15]], 6)
+        selected_red.sort()
+
+        # 从前5个热号中随机选择1个
+        selected_blue = random.choice([number for number, _ in frequency['blue'][:5]])
+
+        return {
+            'red_balls': selected_red,
+            'blue_ball': selected_blue,
+            'confidence': 0.6,
+            'method': '基于历史频率分析'
+        }
+
+    except Exception as e:
+        logger.error(f"频率预测失败: {e}")
+        return None
+
+
+@PredictorRegistry.predictor('trend', '趋势分析法', 0.7, requires=('frequency', 'recent'))
+def predict_by_trend(states):
+    """基于趋势的预测算法"""
+    try:
+        recent_results = states['recent']
+        if len(recent_results) < 10:
+            return None
+
+        # 分析最近的号码趋势
+        recent_red_counter = Counter()
+        recent_blue_counter = Counter()
+        for red_balls, blue_ball in recent_results:
+            recent_red_counter.update(red_balls)
+            recent_blue_counter[blue_ball] += 1
+
+        # 计算综合得分：历史频率高但最近出现少
+        red_scores = {
+            number: frequency * 0.7 + (20 - recent_red_counter.get(number, 0)) * 0.3
+            for number, frequency in states['frequency']['red']
+        }
+        top_red = sorted(red_scores.items(), key=lambda x: x[1], reverse=True)[:12]
+        selected_red = sorted(random.sample([x[0] for x in top_red], 6))
+
+        # 蓝球选择
+        blue_scores = {
+            number: frequency * 0.7 + (20 - recent_blue_counter.get(number, 0)) * 0.3
+            for number, frequency in states['frequency']['blue']
+        }
+        top_blue = sorted(blue_scores.items(), key=lambda x: x[1], reverse=True)[:3]
+        selected_blue = random.choice([x[0] for x in top_blue])
+
+        return {
+            'red_balls': selected_red,
+            'blue_ball': selected_blue,
+            'confidence': 0.7,
+            'method': '基于趋势分析'
+        }
+
+    except Exception as e:
+        logger.error(f"趋势预测失败: {e}")
+        return None
+
+
+@PredictorRegistry.predictor('combined', '组合预测法', 0.8, requires=('frequency', 'recent'))
+def predict_by_combined(states):
+    """组合预测算法（复用频率和趋势算法的状态，不再重复查询）"""
+    try:
+        freq_pred = predict_by_frequency(states)
+        trend_pred = predict_by_trend(states)
+
+        if not freq_pred or not trend_pred:
+            return freq_pred or trend_pred
+
+        # 红球：从两种预测中各选3个，然后随机组合
+        combined_red = list(set(freq_pred['red_balls'][:3] + trend_pred['red_balls'][:3]))
+        if len(combined_red) < 6:
+            # 如果不够6个，从剩余的号码中补充
+            all_red = set(freq_pred['red_balls'] + trend_pred['red_balls'])
+            while len(combined_red) < 6 and len(all_red) > len(combined_red):
+                remaining = list(all_red - set(combined_red))
+                combined_red.append(random.choice(remaining))
+
+        selected_red = sorted(combined_red[:6])
+
+        # 蓝球：随机选择一种预测结果
+        selected_blue = random.choice([freq_pred['blue_ball'], trend_pred['blue_ball']])
+
+        return {
+            'red_balls': selected_red,
+            'blue_ball': selected_blue,
+            'confidence': 0.8,
+            'method': '组合预测算法'
+        }
+
+    except Exception as e:
+        logger.error(f"组合预测失败: {e}")
+        return None
+
+
+@PredictorRegistry.predictor('markov', '马尔可夫转移法', 0.65, requires=('markov',))
+def predict_by_markov(states):
+    """基于号码转移矩阵的预测算法"""
+    try:
+        prediction = MarkovService.predict(states['markov'])
+        if not prediction:
+            return None
+
+        prediction.update({
+            'confidence': 0.65,
+            'method': '马尔可夫转移分析'
+        })
+        return prediction
+
+    except Exception as e:
+        logger.error(f"马尔可夫预测失败: {e}")
+        return None
+
+
+@PredictorRegistry.predictor('decayed', '衰减频率法', 0.6, requires=('decayed_frequency',))
+def predict_by_decayed_frequency(states):
+    """按最短半衰期的衰减得分与期望得分之比选号：近期权重更高，且不受统计窗口边界影响"""
+    try:
+        scores = states['decayed_frequency']
+        if not scores:
+            return None
+
+        red_ratio = scores['red'][:, 0] / scores['expected']['red'][0]
+        blue_ratio = scores['blue'][:, 0] / scores['expected']['blue'][0]
+
+        # 从得分最高的12个红球中随机选择6个，从前3个蓝球中随机选择1个
+        top_red = sorted(range(len(red_ratio)), key=lambda i: red_ratio[i], reverse=True)[:12]
+        selected_red = sorted(int(i) + 1 for i in random.sample(top_red, 6))
+        top_blue = sorted(range(len(blue_ratio)), key=lambda i: blue_ratio[i], reverse=True)[:3]
+        selected_blue = int(random.choice(top_blue)) + 1
+
+        return {
+            'red_balls': selected_red,
+            'blue_ball': selected_blue,
+            'confidence': 0.6,
+            'method': '基于指数衰减频率'
+        }
+
+    except Exception as e:
+        logger.error(f"衰减频率预测失败: {e}")
+        return None
@@ -0,0 +1,15 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_process_pool():
+    """全进程共享的计算进程池（首次使用时创建），供模拟、批量兑奖等纯 numpy 计算任务使用"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _executor
@@ -0,0 +1,226 @@
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+from src.models.lottery import LotteryResult
+from src.services.lottery_service import LotteryService
+from src.services.ingest import IngestService
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE, LOTTERY_TYPES
+
+try:
+    import fcntl
+except ImportError:  # Windows 下不做跨进程互斥
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DRAW_TIMEZONE = ZoneInfo('Asia/Shanghai')
+DRAW_TIME = time(21, 15)                    # 开奖时间
+SETTLE_DELAY = timedelta(minutes=10)        # 开奖后等待上游发布数据的时间
+INITIAL_BACKOFF = 120                       # 首次轮询未发现新开奖后的等待秒数，之后逐次翻倍
+MAX_BACKOFF = 1800
+MAX_WAIT = timedelta(hours=12)              # 超过预计开奖时间这么久仍无数据，视为停开（节假日等），跳到下一期
+LEARN_DRAWS = 60                            # 根据最近多少期推断开奖星期
+MIN_WEEKDAY_SHARE = 0.1                     # 星期在最近开奖中占比达到该比例才视为开奖日
+INGEST_PAGES = 1                            # 定时同步只需获取第一页（100期）
+CATCH_UP_DAYS = 200                         # 本地数据落后超过该天数时按手动同步的页数补齐
+CATCH_UP_PAGES = 10
+
+WEEK_NAMES = {'一': 0, '二': 1, '三': 2, '四': 3, '五': 4, '六': 5, '日': 6, '天': 6}
+
+
+def parse_weekday(week, lottery_date):
+    """优先使用 week 列（如 "二"、"星期二"），无法识别时按开奖日期计算"""
+    if week:
+        name = week.strip()[-1:]
+        if name in WEEK_NAMES:
+            return WEEK_NAMES[name]
+    return lottery_date.weekday() if lottery_date else None
+
+
+def learn_draw_weekdays(rows):
+    """由最近开奖的 (lottery_date, week) 推断开奖星期，返回升序的星期列表（0=周一）
+
+    没有历史数据时视为每天都可能开奖。
+    """
+    counter = Counter(
+        weekday for weekday in (parse_weekday(week, lottery_date) for lottery_date, week in rows)
+        if weekday is not None
+    )
+    total = sum(counter.values())
+    weekdays = sorted(day for day, count in counter.items() if count >= total * MIN_WEEKDAY_SHARE)
+    return weekdays or list(range(7))
+
+
+def next_draw_time(weekdays, after_date):
+    """after_date 之后第一个开奖日的开奖时间（带时区）"""
+    day = after_date + timedelta(days=1)
+    while day.weekday() not in weekdays:
+        day += timedelta(days=1)
+    return datetime.combine(day, DRAW_TIME, tzinfo=DRAW_TIMEZONE)
+
+
+class DrawScheduler:
+    """按开奖日历自动同步一个彩种：休眠到预计开奖之后，退避轮询上游直到出现新一期，再执行一次入库
+
+    每期只有开奖后的少量请求，取代固定间隔的定时拉取。每个彩种一个调度器，各自推断开奖日历。
+    """
+
+    def __init__(self, app, lottery_type=DEFAULT_LOTTERY_TYPE):
+        self.app = app
+        self.lottery_type = lottery_type
+        self._stop = threading.Event()
+        self._thread = None
+        self.status = {
+            'lottery_type': lottery_type,
+            'weekdays': [],
+            'next_draw': None,
+            'last_poll': None,
+            'last_sync': None,
+            'last_issue': None,
+            'upstream_requests': 0
+        }
+
+    def start(self):
+        """启动后台线程"""
+        self._thread = threading.Thread(
+            target=self._run, name=f'draw-scheduler-{self.lottery_type}', daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def _load_calendar(self):
+        """读取该彩种最近开奖，返回 (开奖星期, 最新开奖日期, 最新期号)"""
+        rows = LotteryResult.query.with_entities(
+            LotteryResult.lottery_date, LotteryResult.week, LotteryResult.issue_number
+        ).filter(
+            LotteryResult.type == self.lottery_type
+        ).order_by(LotteryResult.lottery_date.desc()).limit(LEARN_DRAWS).all()
+        weekdays = learn_draw_weekdays([(row[0], row[1]) for row in rows])
+        if not rows:
+            return weekdays, None, None
+        return weekdays, rows[0][0], rows[0][2]
+
+    def _upstream_latest_issue(self):
+        self.status['upstream_requests'] += 1
+        self.status['last_poll'] = datetime.now(DRAW_TIMEZONE)
+        data = LotteryService.fetch_lottery_data(type_id=self.lottery_type, page=1, limit=1)
+        if not data or data.get('code') != 1:
+            return None
+        items = data.get('data', {}).get('list', [])
+        return items[0].get('issue_number') if items else None
+
+    def _sleep_until(self, moment):
+        """休眠到指定时间，被停止时返回 False"""
+        seconds = (moment - datetime.now(DRAW_TIMEZONE)).total_seconds()
+        return not (seconds > 0 and self._stop.wait(seconds))
+
+    def _poll(self, expected):
+        """退避轮询直到上游出现新一期并完成入库，返回 True；超过等待上限返回 False"""
+        delay = INITIAL_BACKOFF
+        deadline = expected + MAX_WAIT
+        while not self._stop.is_set():
+            with self.app.app_context():
+                _, stored_date, stored_issue = self._load_calendar()
+                upstream_issue = self._upstream_latest_issue()
+
+                # 期间可能已经手动同步过，此时不再重复入库
+                if upstream_issue and upstream_issue != stored_issue:
+                    exists = LotteryResult.query.filter_by(
+                        type=self.lottery_type, issue_number=upstream_issue
+                    ).first() is not None
+                    if not exists:
+                        behind = stored_date is None or (expected.date() - stored_date).days > CATCH_UP_DAYS
+                        result = IngestService.run(
+                            max_pages=CATCH_UP_PAGES if behind else INGEST_PAGES,
+                            lottery_types=[self.lottery_type]
+                        )
+                        self.status['last_sync'] = datetime.now(DRAW_TIMEZONE)
+                        logger.info(
+                            f"自动同步完成: 彩种 {self.lottery_type} 新增 {result['saved_count']} 条, "
+                            f"期号 {result['new_issues']}"
+                        )
+                    return True
+
+            if datetime.now(DRAW_TIMEZONE) + timedelta(seconds=delay) > deadline:
+                return False
+            if self._stop.wait(delay):
+                return False
+            delay = min(delay * 2, MAX_BACKOFF)
+        return False
+
+    def _run(self):
+        missed_date = None
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    weekdays, last_date, last_issue = self._load_calendar()
+                # 最新开奖之后的下一个开奖日；本地数据落后时该时间已过去，会立即开始轮询补齐
+                known = [d for d in (last_date, missed_date) if d]
+                after = max(known) if known else datetime.now(DRAW_TIMEZONE).date() - timedelta(days=1)
+                expected = next_draw_time(weekdays, after)
+
+                self.status.update(weekdays=weekdays, last_issue=last_issue, next_draw=expected)
+                logger.info(f"自动同步: 彩种 {self.lottery_type} 预计下次开奖 {expected.strftime('%Y-%m-%d %H:%M')}")
+
+                if not self._sleep_until(expected + SETTLE_DELAY):
+                    break
+                if self._poll(expected):
+                    missed_date = None
+                elif not self._stop.is_set():
+                    logger.warning(f"彩种 {self.lottery_type} {expected.strftime('%Y-%m-%d')} 未获取到新开奖，按停开处理")
+                    # 上游已无更新，之前已过去的开奖日不再逐个轮询
+                    missed_date = max(expected.date(), datetime.now(DRAW_TIMEZONE).date() - timedelta(days=1))
+            except Exception as e:
+                logger.error(f"彩种 {self.lottery_type} 自动同步失败: {e}")
+                self._stop.wait(MAX_BACKOFF)
+
+    def get_status(self):
+        status = dict(self.status)
+        for key in ('next_draw', 'last_poll', 'last_sync'):
+            if status[key]:
+                status[key] = status[key].strftime('%Y-%m-%d %H:%M:%S')
+        status['running'] = self._thread is not None and self._thread.is_alive()
+        return status
+
+
+_process_lock = None
+
+
+def _acquire_process_lock(lock_path):
+    """同一数据库只允许一个进程运行调度器"""
+    global _process_lock
+    if fcntl is None or lock_path is None:
+        return True
+    lock_file = open(lock_path, 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _process_lock = lock_file
+    return True
+
+
+def init_scheduler(app, lock_path):
+    """按环境变量 AUTO_SYNC 为每个已配置的彩种启动自动同步（默认关闭，设为 1 开启）
+
+    默认关闭，避免 WSGI worker、脚本、交互式 shell 和测试导入应用时在后台轮询上游接口。
+    """
+    if os.environ.get('AUTO_SYNC', '0') != '1':
+        return None
+    if not _acquire_process_lock(lock_path):
+        logger.info("自动同步调度器已在其他进程中运行")
+        return None
+    schedulers = {}
+    for lottery_type in LOTTERY_TYPES:
+        scheduler = DrawScheduler(app, lottery_type)
+        scheduler.start()
+        schedulers[lottery_type] = scheduler
+    app.extensions['draw_schedulers'] = schedulers
+    return schedulers
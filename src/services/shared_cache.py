@@ -0,0 +1,240 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# 缓存库与业务库分开存放，缓存读写不占用业务库的写锁
+DEFAULT_PATH = os.environ.get(
+    'ANALYSIS_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'cache.db')
+)
+
+MAX_BYTES = 64 * 1024 * 1024     # 缓存总大小上限，超出后按最近访问时间淘汰
+TOUCH_INTERVAL = 60              # 访问时间最多每分钟更新一次，避免每次命中都写库
+LEASE_SECONDS = 120              # 计算租约有效期，持有者异常退出后其他进程可接手
+WAIT_INTERVAL = 0.05             # 等待其他进程计算结果时的轮询间隔
+EVENT_RETENTION = 600            # 跨进程广播事件的保留时长（秒）
+
+# 缓存库结构版本（PRAGMA user_version），旧结构的缓存库直接清空重建
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    partition_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed ON cache_entries (accessed_at);
+CREATE INDEX IF NOT EXISTS ix_cache_entries_partition ON cache_entries (partition_name, version);
+CREATE TABLE IF NOT EXISTS cache_leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cache_meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cache_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    origin TEXT NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+_DROP_SCHEMA = """
+DROP TABLE IF EXISTS cache_entries;
+DROP TABLE IF EXISTS cache_leases;
+DROP TABLE IF EXISTS cache_meta;
+DROP TABLE IF EXISTS cache_events;
+"""
+
+
+def make_key(name, version, params):
+    raw = repr((name, version, tuple(sorted(params.items()))))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class SharedCacheStore:
+    """基于本地 SQLite 文件的跨进程缓存：同一台机器上的所有 worker 共享
+
+    - 条目按 (分析名, 数据版本, 参数) 存储，数据版本变化后旧条目不再命中
+    - 条目归属于分区（彩种），各分区的失效和代数互相独立
+    - 总大小超过 max_bytes 时按最近访问时间淘汰
+    - 入库后调用 invalidate() 清除该分区的旧版本并递增其代数，其他进程据此丢弃进程内缓存
+    - 同一条目同一时刻只有一个进程在计算（租约），其他进程等待其结果
+    - 另保存最近的广播事件，各进程据此把其他进程发布的事件转发给自己的订阅者
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        # fork 出的子进程不能复用父进程的连接
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            if connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                connection.executescript(_DROP_SCHEMA)
+                connection.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def generation(self, partition):
+        row = self._connection().execute(
+            "SELECT value FROM cache_meta WHERE name = ?", (f'generation:{partition}',)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, key):
+        """返回 (是否命中, 值)"""
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, accessed_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return False, None
+        now = time.time()
+        if now - row[1] > TOUCH_INTERVAL:
+            connection.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return True, pickle.loads(row[0])
+
+    def set(self, key, partition, name, version, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, partition_name, name, version, value, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, partition, name, version, data, len(data), time.time())
+            )
+            self._evict(connection)
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def _evict(self, connection):
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in connection.execute(
+            "SELECT key, size FROM cache_entries ORDER BY accessed_at ASC"
+        ).fetchall():
+            connection.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def acquire_lease(self, key):
+        """尝试取得计算租约，返回租约标识；已被其他未过期的持有者占用时返回 None"""
+        owner = uuid.uuid4().hex
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO cache_leases (key, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE cache_leases.expires_at < ?",
+            (key, owner, now + LEASE_SECONDS, now)
+        )
+        return owner if cursor.rowcount == 1 else None
+
+    def release_lease(self, key, owner):
+        self._connection().execute(
+            "DELETE FROM cache_leases WHERE key = ? AND owner = ?", (key, owner)
+        )
+
+    def wait_for(self, key, timeout=LEASE_SECONDS):
+        """等待其他进程完成计算；租约释放或超时仍无结果时返回 (False, None)"""
+        deadline = time.time() + timeout
+        connection = self._connection()
+        while time.time() < deadline:
+            found, value = self.get(key)
+            if found:
+                return True, value
+            if connection.execute("SELECT 1 FROM cache_leases WHERE key = ?", (key,)).fetchone() is None:
+                # 租约已释放但没有写入结果（计算失败），由调用方自行计算
+                return self.get(key)
+            time.sleep(WAIT_INTERVAL)
+        return False, None
+
+    def invalidate(self, partition, current_version=None):
+        """删除该分区中非当前数据版本的条目并递增其代数；返回删除的条目数"""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if current_version is None:
+                deleted = connection.execute(
+                    "DELETE FROM cache_entries WHERE partition_name = ?", (partition,)
+                ).rowcount
+            else:
+                deleted = connection.execute(
+                    "DELETE FROM cache_entries WHERE partition_name = ? AND version != ?",
+                    (partition, current_version)
+                ).rowcount
+            connection.execute(
+                "INSERT INTO cache_meta (name, value) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                (f'generation:{partition}',)
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return deleted
+
+    def append_event(self, origin, event, data):
+        """记录一条广播事件，同时清除超过保留时长的旧事件"""
+        now = time.time()
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                "INSERT INTO cache_events (origin, event, data, created_at) VALUES (?, ?, ?, ?)",
+                (origin, event, json.dumps(data, ensure_ascii=False), now)
+            )
+            connection.execute("DELETE FROM cache_events WHERE created_at < ?", (now - EVENT_RETENTION,))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def last_event_id(self):
+        return self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM cache_events").fetchone()[0]
+
+    def events_after(self, event_id):
+        """返回 id 大于 event_id 的事件 [(id, 来源, 事件名, 数据)]，按发布顺序"""
+        rows = self._connection().execute(
+            "SELECT id, origin, event, data FROM cache_events WHERE id > ? ORDER BY id", (event_id,)
+        ).fetchall()
+        return [(row[0], row[1], row[2], json.loads(row[3])) for row in rows]
+
+    def stats(self):
+        count, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+        partitions = dict(self._connection().execute(
+            "SELECT partition_name, COUNT(*) FROM cache_entries GROUP BY partition_name"
+        ).fetchall())
+        return {'entries': count, 'bytes': size, 'max_bytes': self.max_bytes, 'partitions': partitions}
@@ -0,0 +1,231 @@
+import math
+import time
+import numpy as np
+from src.services.draw_history import DrawHistory
+from src.services.analysis_cache import AnalysisCache
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE
+from src.services.process_pool import get_process_pool
+
+RED_PICK = 6
+RED_GAP_WINDOW = 128
+BLUE_GAP_WINDOW = 384
+
+
+def _current_gaps(hits):
+    """每个号码距最近一次出现的期数（...×N×K 命中矩阵，从未出现记为 N）"""
+    total = hits.shape[-2]
+    reversed_hits = hits[..., ::-1, :]
+    gaps = np.argmax(reversed_hits, axis=-2)
+    gaps[~reversed_hits.any(axis=-2)] = total
+    return gaps
+
+
+def _sample_red_picks(rng, shape, red_count):
+    """Floyd 算法：每期无放回抽取6个红球（下标0至红球个数-1），返回 shape×6 的号码下标
+
+    已选号码记录在每期一个 uint64 位掩码中，6步即可完成，无需为每期生成红球个数个随机键。
+    """
+    masks = np.zeros(shape, dtype=np.uint64)
+    picks = np.empty(shape + (RED_PICK,), dtype=np.uint64)
+    for step, j in enumerate(range(red_count - RED_PICK, red_count)):
+        candidate = rng.integers(0, j, size=shape, dtype=np.uint64, endpoint=True)
+        taken = ((masks >> candidate) & np.uint64(1)).astype(bool)
+        chosen = np.where(taken, np.uint64(j), candidate)
+        masks |= np.uint64(1) << chosen
+        picks[..., step] = chosen
+    return picks
+
+
+def _batch_counts(picks, batch_size, size):
+    """按模拟批次统计各号码出现次数（一次 bincount 完成）"""
+    offsets = (np.arange(batch_size, dtype=np.int64) * size).reshape((batch_size,) + (1,) * (picks.ndim - 1))
+    flat = (picks.astype(np.int64) + offsets).ravel()
+    return np.bincount(flat, minlength=batch_size * size).reshape(batch_size, size).astype(np.int32)
+
+
+def _simulate_batch(total_draws, batch_size, seed, red_count, blue_count):
+    """模拟 batch_size 段长度为 total_draws 的随机开奖历史，返回各号码的频次和遗漏
+
+    运行于进程池中，只依赖 numpy，不访问数据库。遗漏只需看最近的 RED_GAP_WINDOW / BLUE_GAP_WINDOW 期：
+    以双色球为例，红球连续128期未出现的概率约为1e-11，蓝球连续384期未出现的概率约为2e-11。
+    """
+    rng = np.random.default_rng(seed)
+
+    red_picks = _sample_red_picks(rng, (batch_size, total_draws), red_count)
+    red_counts = _batch_counts(red_picks, batch_size, red_count)
+    window = min(total_draws, RED_GAP_WINDOW)
+    red_hits = np.zeros((batch_size, window, red_count), dtype=bool)
+    np.put_along_axis(red_hits, red_picks[:, -window:].astype(np.intp), True, axis=2)
+    red_gaps = _current_gaps(red_hits)
+
+    blues = rng.integers(0, blue_count, (batch_size, total_draws))
+    blue_counts = _batch_counts(blues, batch_size, blue_count)
+    window = min(total_draws, BLUE_GAP_WINDOW)
+    blue_hits = np.zeros((batch_size, window, blue_count), dtype=bool)
+    np.put_along_axis(blue_hits, blues[:, -window:, None], True, axis=2)
+    blue_gaps = _current_gaps(blue_hits)
+
+    return red_counts, red_gaps, blue_counts, blue_gaps
+
+
+def _runs_test(hits):
+    """对每个号码的出现/未出现序列做 Wald-Wolfowitz 游程检验（各列同时计算）"""
+    total = hits.shape[0]
+    n1 = hits.sum(axis=0).astype(np.float64)
+    n0 = total - n1
+    runs = 1 + (np.diff(hits, axis=0) != 0).sum(axis=0)
+    mean = 2 * n1 * n0 / total + 1
+    var = 2 * n1 * n0 * (2 * n1 * n0 - total) / (total ** 2 * (total - 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(var > 0, (runs - mean) / np.sqrt(var), 0.0)
+    p_values = np.array([math.erfc(abs(v) / math.sqrt(2)) for v in z])
+    return runs, z, p_values
+
+
+def _two_sided_p(simulated, observed):
+    """基于模拟分布的双侧经验p值（各列同时计算）"""
+    sims = simulated.shape[0]
+    upper = ((simulated >= observed).sum(axis=0) + 1) / (sims + 1)
+    lower = ((simulated <= observed).sum(axis=0) + 1) / (sims + 1)
+    return np.minimum(1.0, 2 * np.minimum(upper, lower))
+
+
+def _upper_p(simulated, observed):
+    """基于模拟分布的单侧（偏大）经验p值"""
+    sims = simulated.shape[0]
+    return ((simulated >= observed).sum(axis=0) + 1) / (sims + 1)
+
+
+def _chi_square(counts, expected):
+    """按行计算卡方统计量"""
+    return ((counts - expected) ** 2 / expected).sum(axis=-1)
+
+
+class SignificanceService:
+    """冷热号显著性检验（卡方、游程检验及蒙特卡洛模拟）"""
+
+    DEFAULT_SIMULATIONS = 10000
+    MAX_SIMULATIONS = 100000
+    DEFAULT_SEED = 20250806
+    SIGNIFICANCE_LEVEL = 0.05
+
+    # 单个模拟批次的期数上限（批次×期数），控制每个任务的内存占用
+    BATCH_DRAWS = 1000000
+    # 总期数低于该值时直接在当前进程计算，避免进程池开销
+    INLINE_DRAWS = 2000000
+
+    @classmethod
+    def run_simulations(cls, total_draws, simulations, seed, red_count, blue_count):
+        """分批模拟随机开奖历史（号码范围按彩种），批次分配到进程池并行执行；相同种子结果可复现"""
+        batch_size = max(1, min(simulations, cls.BATCH_DRAWS // total_draws))
+        batches = []
+        remaining = simulations
+        while remaining > 0:
+            batches.append(min(batch_size, remaining))
+            remaining -= batches[-1]
+        seeds = np.random.SeedSequence(seed).spawn(len(batches))
+
+        if simulations * total_draws <= cls.INLINE_DRAWS:
+            parts = [_simulate_batch(total_draws, size, s, red_count, blue_count) for size, s in zip(batches, seeds)]
+        else:
+            parts = list(get_process_pool().map(
+                _simulate_batch, [total_draws] * len(batches), batches, seeds,
+                [red_count] * len(batches), [blue_count] * len(batches)
+            ))
+
+        return tuple(np.concatenate([part[i] for part in parts]) for i in range(4))
+
+    @staticmethod
+    def compute_significance(history, simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED):
+        """对给定历史做显著性分析"""
+        total = len(history)
+        if total < 2:
+            return None
+
+        started = time.perf_counter()
+        red_hits = history.red_hits().astype(bool)
+        blue_hits = history.blue_hits().astype(bool)
+
+        observed_red = red_hits.sum(axis=0)
+        observed_blue = blue_hits.sum(axis=0)
+        observed_red_gaps = _current_gaps(red_hits)
+        observed_blue_gaps = _current_gaps(blue_hits)
+
+        red_count, blue_count = history.red_count, history.blue_count
+        sim_red, sim_red_gaps, sim_blue, sim_blue_gaps = SignificanceService.run_simulations(
+            total, simulations, seed, red_count, blue_count
+        )
+
+        expected_red = total * RED_PICK / red_count
+        expected_blue = total / blue_count
+
+        # 卡方统计量的p值由模拟分布给出（红球为无放回抽样，不严格服从卡方分布）
+        chi_square = {}
+        for ball_type, observed, simulated, expected, size in (
+            ('red', observed_red, sim_red, expected_red, red_count),
+            ('blue', observed_blue, sim_blue, expected_blue, blue_count)
+        ):
+            statistic = float(_chi_square(observed, expected))
+            sim_statistics = _chi_square(simulated, expected)
+            chi_square[ball_type] = {
+                'statistic': round(statistic, 3),
+                'degrees_of_freedom': size - 1,
+                'p_value': round(float(((sim_statistics >= statistic).sum() + 1) / (simulations + 1)), 4)
+            }
+
+        numbers = []
+        for ball_type, hits, observed, simulated, gaps, sim_gaps, expected in (
+            ('red', red_hits, observed_red, sim_red, observed_red_gaps, sim_red_gaps, expected_red),
+            ('blue', blue_hits, observed_blue, sim_blue, observed_blue_gaps, sim_blue_gaps, expected_blue)
+        ):
+            freq_band = np.percentile(simulated, [2.5, 97.5], axis=0)
+            gap_band = np.percentile(sim_gaps, [2.5, 97.5], axis=0)
+            freq_p = _two_sided_p(simulated, observed)
+            gap_p = _upper_p(sim_gaps, gaps)
+            runs, runs_z, runs_p = _runs_test(hits)
+
+            for i in range(hits.shape[1]):
+                numbers.append({
+                    'number': i + 1,
+                    'ball_type': ball_type,
+                    'frequency': int(observed[i]),
+                    'expected_frequency': round(expected, 3),
+                    'frequency_band': [float(freq_band[0, i]), float(freq_band[1, i])],
+                    'frequency_p_value': round(float(freq_p[i]), 4),
+                    'gap': int(gaps[i]),
+                    'gap_band': [float(gap_band[0, i]), float(gap_band[1, i])],
+                    'gap_p_value': round(float(gap_p[i]), 4),
+                    'runs': int(runs[i]),
+                    'runs_z': round(float(runs_z[i]), 3),
+                    'runs_p_value': round(float(runs_p[i]), 4),
+                    'significant': bool(freq_p[i] < SignificanceService.SIGNIFICANCE_LEVEL
+                                        or gap_p[i] < SignificanceService.SIGNIFICANCE_LEVEL)
+                })
+
+        return {
+            'total_draws': total,
+            'simulations': simulations,
+            'seed': seed,
+            'significance_level': SignificanceService.SIGNIFICANCE_LEVEL,
+            'chi_square': chi_square,
+            'numbers': numbers,
+            'significant_numbers': [
+                {'number': n['number'], 'ball_type': n['ball_type']} for n in numbers if n['significant']
+            ],
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    @staticmethod
+    def get_significance(start_date=None, simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED,
+                         lottery_type=DEFAULT_LOTTERY_TYPE):
+        """获取指定彩种的显著性分析结果，按该彩种的数据版本缓存"""
+        def compute():
+            history = DrawHistory.load(start_date=start_date, lottery_type=lottery_type)
+            return SignificanceService.compute_significance(history, simulations=simulations, seed=seed)
+
+        params = {
+            'start_date': start_date.isoformat() if start_date else None,
+            'simulations': simulations,
+            'seed': seed
+        }
+        return AnalysisCache.get_or_compute('significance', params, compute, lottery_type=lottery_type)
@@ -0,0 +1,87 @@
+import time
+import numpy as np
+from src.services.draw_history import DrawHistory, numbers_to_mask, mask_to_numbers
+from src.services.analysis_cache import AnalysisCache
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE
+
+
+class PackedHistory:
+    """某一彩种全部开奖的紧凑数组：每期一个红球位掩码、一个蓝球号码，按日期升序"""
+
+    def __init__(self, history):
+        self.issues = history.issues
+        self.dates = history.date_array()
+        self.red_masks = history.red_masks()
+        self.blues = history.blues.copy()
+
+    def __len__(self):
+        return len(self.issues)
+
+    def date_slice(self, start_date=None, end_date=None):
+        """日期范围对应的下标区间（日期已排序，二分查找即可）"""
+        lo = np.searchsorted(self.dates, np.datetime64(start_date, 'D')) if start_date else 0
+        hi = np.searchsorted(self.dates, np.datetime64(end_date, 'D'), side='right') if end_date else len(self)
+        return int(lo), int(hi)
+
+
+class SimilarityService:
+    """相似开奖检索"""
+
+    DEFAULT_TOP = 20
+    MAX_TOP = 500
+
+    @staticmethod
+    def get_packed_history(lottery_type=DEFAULT_LOTTERY_TYPE):
+        """按彩种及其数据版本缓存的紧凑历史"""
+        # 重建很快且只在本进程使用，不放入共享缓存
+        return AnalysisCache.get_or_compute(
+            'packed_history', {}, lambda: PackedHistory(DrawHistory.load(lottery_type=lottery_type)),
+            shared=False, lottery_type=lottery_type
+        )
+
+    @staticmethod
+    def find_similar(packed, red_balls, blue_ball=None, min_overlap=1, top=DEFAULT_TOP,
+                     start_date=None, end_date=None):
+        """找出与给定号码重合数不少于 min_overlap 的开奖，按红球重合数、蓝球是否相同、日期倒序排列
+
+        重合数为 popcount(查询掩码 & 开奖掩码)，对整个日期区间一次向量化计算。
+        """
+        started = time.perf_counter()
+        query_mask = np.uint64(numbers_to_mask(red_balls))
+        lo, hi = packed.date_slice(start_date, end_date)
+
+        masks = packed.red_masks[lo:hi]
+        overlap = np.bitwise_count(masks & query_mask)
+        blue_match = packed.blues[lo:hi] == blue_ball if blue_ball else np.zeros(hi - lo, dtype=bool)
+
+        candidates = np.flatnonzero(overlap >= min_overlap)
+        total_matches = len(candidates)
+        # 排序键：红球重合数优先，其次蓝球，再按日期（下标越大越新）
+        score = (overlap[candidates].astype(np.int64) * 2 + blue_match[candidates]) * (hi - lo + 1) + candidates
+        if len(candidates) > top:
+            keep = np.argpartition(-score, top - 1)[:top]
+            candidates, score = candidates[keep], score[keep]
+        ordered = candidates[np.argsort(-score)]
+
+        matches = []
+        for offset in ordered.tolist():
+            index = lo + offset
+            mask = int(packed.red_masks[index])
+            matches.append({
+                'issue_number': packed.issues[index],
+                'lottery_date': str(packed.dates[index]),
+                'red_balls': mask_to_numbers(mask),
+                'blue_ball': int(packed.blues[index]),
+                'red_overlap': int(overlap[offset]),
+                'blue_match': bool(blue_match[offset]),
+                'matched_numbers': mask_to_numbers(mask & int(query_mask))
+            })
+
+        return {
+            'query': {'red_balls': sorted(red_balls), 'blue_ball': blue_ball},
+            'searched_draws': hi - lo,
+            'total_matches': total_matches,
+            'overlap_distribution': {k: int(np.count_nonzero(overlap == k)) for k in range(len(red_balls) + 1)},
+            'matches': matches,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
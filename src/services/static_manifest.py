@@ -0,0 +1,94 @@
+import hashlib
+import mimetypes
+import os
+import re
+from flask import Response
+from src.services.compression import choose_encoding, compress, is_compressible
+
+# 带内容哈希的文件名内容不变，可以长期缓存
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# 入口页面和未带哈希的文件名每次都要向服务器确认（ETag 未变时返回 304）
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# 预压缩使用最高级别：只在启动时压缩一次
+PRECOMPRESS_LEVELS = {'br': 11, 'gzip': 9}
+
+
+class StaticAsset:
+    """一个静态文件的内存副本及其预压缩版本"""
+
+    __slots__ = ('path', 'hashed_path', 'mimetype', 'digest', 'body', 'encoded')
+
+    def __init__(self, path, body):
+        self.path = path
+        self.body = body
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        stem, ext = os.path.splitext(path)
+        self.hashed_path = f'{stem}.{self.digest}{ext}'
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.encoded = {}
+        if is_compressible(self.mimetype):
+            for encoding, level in PRECOMPRESS_LEVELS.items():
+                data = compress(body, encoding, level)
+                # 压缩后没有变小的不保留
+                if len(data) < len(body):
+                    self.encoded[encoding] = data
+
+
+class StaticManifest:
+    """启动时扫描静态目录生成的清单，请求时只查字典，不再访问文件系统
+
+    非 HTML 文件额外以带哈希的文件名提供，HTML 中对这些文件的引用在生成清单时替换为带哈希的路径。
+    """
+
+    def __init__(self, assets):
+        self.assets = assets
+        self.routes = {}
+        for asset in assets.values():
+            self.routes[asset.path] = (asset, False)
+            if asset.mimetype != 'text/html':
+                self.routes[asset.hashed_path] = (asset, True)
+
+    @classmethod
+    def build(cls, folder):
+        files = {}
+        for root, _, names in os.walk(folder):
+            for name in names:
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, folder).replace(os.sep, '/')
+                with open(full_path, 'rb') as f:
+                    files[path] = f.read()
+
+        assets = {
+            path: StaticAsset(path, body)
+            for path, body in files.items() if not path.endswith('.html')
+        }
+        # HTML 中引用的静态文件改为带哈希的路径（匹配被引号或括号包围的 /路径 或 路径）
+        for path, body in files.items():
+            if not path.endswith('.html'):
+                continue
+            text = body.decode('utf-8')
+            for asset in assets.values():
+                pattern = re.compile(r'(["\'(])/?' + re.escape(asset.path) + r'(["\')])')
+                text = pattern.sub(lambda m, a=asset: f'{m.group(1)}/{a.hashed_path}{m.group(2)}', text)
+            assets[path] = StaticAsset(path, text.encode('utf-8'))
+        return cls(assets)
+
+    def lookup(self, path):
+        """返回 (StaticAsset, 是否为带哈希路径)，不存在时返回 (None, False)"""
+        return self.routes.get(path, (None, False))
+
+    @staticmethod
+    def make_response(asset, immutable, request):
+        """按 Accept-Encoding 返回预压缩版本，并设置缓存头和 ETag"""
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'), tuple(asset.encoded))
+        body = asset.encoded[encoding] if encoding else asset.body
+
+        response = Response(body, mimetype=asset.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if asset.encoded:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        response.set_etag(f'{asset.digest}-{encoding}' if encoding else asset.digest)
+        return response.make_conditional(request)
@@ -0,0 +1,146 @@
+import re
+import numpy as np
+from src.models.lottery import LotteryResult
+from src.services.draw_history import numbers_to_mask
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE, get_lottery_type
+from src.services.process_pool import get_process_pool
+
+# 奖级：(等级名称, [(红球命中数, 蓝球是否命中), ...])，所有彩种按 6红+1蓝 的奖级规则统计
+PRIZE_TIERS = [
+    ('一等奖', [(6, 1)]),
+    ('二等奖', [(6, 0)]),
+    ('三等奖', [(5, 1)]),
+    ('四等奖', [(5, 0), (4, 1)]),
+    ('五等奖', [(4, 0), (3, 1)]),
+    ('六等奖', [(2, 1), (1, 1), (0, 1)])
+]
+TIER_NAMES = [name for name, _ in PRIZE_TIERS]
+
+# 命中编码 = 红球命中数×2 + 蓝球是否命中，共 14 种
+MATCH_CODES = 14
+
+# 命中编码 → 奖级矩阵（14×6，0/1），按票统计的命中分布乘以它即得各奖级次数
+_TIER_MATRIX = np.zeros((MATCH_CODES, len(PRIZE_TIERS)), dtype=np.int64)
+for _tier, (_, _combos) in enumerate(PRIZE_TIERS):
+    for _red, _blue in _combos:
+        _TIER_MATRIX[_red * 2 + _blue, _tier] = 1
+
+_SEPARATORS = re.compile(r'[\s，,;；|+]+')
+
+
+def parse_ticket(text, lottery_type=DEFAULT_LOTTERY_TYPE):
+    """解析一注号码（6红+1蓝），红蓝拆分与 LotteryResult.parse_win_code 一致，号码范围按彩种；无效时返回 None"""
+    config = get_lottery_type(lottery_type)
+    numbers = [x for x in _SEPARATORS.split(str(text).strip()) if x]
+    if len(numbers) != 7:
+        return None
+    try:
+        red_balls, blue_ball = LotteryResult.parse_win_code(','.join(numbers))
+        if red_balls is None:
+            return None
+        reds = [int(x) for x in red_balls.split(',')]
+    except ValueError:
+        # 含非数字的号码
+        return None
+    if len(set(reds)) != 6 or not all(1 <= n <= config.red_count for n in reds):
+        return None
+    if not 1 <= blue_ball <= config.blue_count:
+        return None
+    return sorted(reds), blue_ball
+
+
+def _match_counts(ticket_masks, ticket_blues, draw_masks, draw_blues, chunk_elements):
+    """计算一批票对全部开奖的命中分布，返回 票数×14 的计数矩阵
+
+    按票分块，每块一次性得到 块大小×开奖期数 的命中矩阵：
+    红球命中数 = popcount(票掩码 & 开奖掩码)，蓝球命中 = 号码相等。
+    运行于进程池中，只依赖 numpy。
+    """
+    total = len(ticket_masks)
+    counts = np.zeros((total, MATCH_CODES), dtype=np.int64)
+    chunk = max(1, chunk_elements // max(1, len(draw_masks)))
+    for start in range(0, total, chunk):
+        masks = ticket_masks[start:start + chunk, None]
+        codes = np.bitwise_count(masks & draw_masks[None, :]).astype(np.int64) * 2
+        codes += ticket_blues[start:start + chunk, None] == draw_blues[None, :]
+        rows = len(codes)
+        codes += np.arange(rows, dtype=np.int64)[:, None] * MATCH_CODES
+        counts[start:start + rows] = np.bincount(codes.ravel(), minlength=rows * MATCH_CODES).reshape(rows, MATCH_CODES)
+    return counts
+
+
+class TicketChecker:
+    """批量兑奖：计算每注号码在历史每一期中的中奖情况"""
+
+    MAX_TICKETS = 200000
+    STREAM_THRESHOLD = 5000
+    # 单个分块的命中矩阵元素上限（票数×开奖期数）
+    CHUNK_ELEMENTS = 2000000
+    # 每个进程池任务处理的票数；票数×开奖期数超过 PARALLEL_ELEMENTS 时才使用进程池
+    TASK_TICKETS = 2000
+    PARALLEL_ELEMENTS = 20000000
+
+    @staticmethod
+    def pack_tickets(tickets):
+        """把解析后的号码打包为位掩码数组和蓝球数组"""
+        masks = np.array([numbers_to_mask(reds) for reds, _ in tickets], dtype=np.uint64)
+        blues = np.array([blue for _, blue in tickets], dtype=np.int16)
+        return masks, blues
+
+    @staticmethod
+    def iter_match_counts(ticket_masks, ticket_blues, packed, lo=0, hi=None):
+        """按批次依次产出 (起始下标, 命中分布矩阵)；数据量大时批次分配到进程池并行计算"""
+        hi = len(packed) if hi is None else hi
+        draw_masks = packed.red_masks[lo:hi]
+        draw_blues = packed.blues[lo:hi]
+        total = len(ticket_masks)
+        starts = list(range(0, total, TicketChecker.TASK_TICKETS))
+
+        if total * len(draw_masks) <= TicketChecker.PARALLEL_ELEMENTS:
+            for start in starts:
+                end = start + TicketChecker.TASK_TICKETS
+                yield start, _match_counts(ticket_masks[start:end], ticket_blues[start:end],
+                                           draw_masks, draw_blues, TicketChecker.CHUNK_ELEMENTS)
+            return
+
+        # executor.map 按提交顺序返回，先完成的批次可以先输出
+        results = get_process_pool().map(
+            _match_counts,
+            [ticket_masks[s:s + TicketChecker.TASK_TICKETS] for s in starts],
+            [ticket_blues[s:s + TicketChecker.TASK_TICKETS] for s in starts],
+            [draw_masks] * len(starts),
+            [draw_blues] * len(starts),
+            [TicketChecker.CHUNK_ELEMENTS] * len(starts)
+        )
+        for start, counts in zip(starts, results):
+            yield start, counts
+
+    @staticmethod
+    def ticket_result(index, ticket, match_counts):
+        """单注号码的兑奖结果"""
+        reds, blue = ticket
+        tier_counts = match_counts @ _TIER_MATRIX
+        best = next((TIER_NAMES[i] for i, count in enumerate(tier_counts) if count), None)
+        return {
+            'index': index,
+            'red_balls': reds,
+            'blue_ball': blue,
+            'tiers': {name: int(count) for name, count in zip(TIER_NAMES, tier_counts)},
+            'winning_draws': int(tier_counts.sum()),
+            'best_tier': best,
+            'matches': {
+                f'{code // 2}+{code % 2}': int(count)
+                for code, count in enumerate(match_counts) if count
+            }
+        }
+
+    @staticmethod
+    def iter_results(tickets, packed, lo=0, hi=None):
+        """逐注产出兑奖结果（tickets 为 [(原始序号, (红球, 蓝球)), ...]）"""
+        if not tickets:
+            return
+        masks, blues = TicketChecker.pack_tickets([ticket for _, ticket in tickets])
+        for start, counts in TicketChecker.iter_match_counts(masks, blues, packed, lo, hi):
+            for offset, row in enumerate(counts):
+                index, ticket = tickets[start + offset]
+                yield TicketChecker.ticket_result(index, ticket, row)
@@ -0,0 +1,170 @@
+import itertools
+import math
+import numpy as np
+from src.services.lottery_types import DEFAULT_LOTTERY_TYPE, get_lottery_type
+
+RED_PICK = 6
+
+
+class TicketGenerator:
+    """缩水过滤：从选定号码池中按条件生成所有符合要求的号码组合
+
+    以深度优先方式按升序逐个选号，每一步都用剩余号码能达到的和值、奇偶上下界提前剪枝，
+    只产出满足条件的组合，不会展开完整的 C(n,6) 空间。
+    """
+
+    def __init__(self, red_pool, blue_pool=None, sum_min=None, sum_max=None,
+                 odd_min=None, odd_max=None, max_consecutive=None,
+                 span_min=None, span_max=None, include=None, exclude=None,
+                 lottery_type=DEFAULT_LOTTERY_TYPE):
+        self.lottery_type = get_lottery_type(lottery_type)
+        self.include = sorted(set(include or []))
+        self.exclude = set(exclude or [])
+        self.pool = sorted((set(red_pool) | set(self.include)) - self.exclude)
+        self.blue_pool = sorted(set(blue_pool or []))
+        self.sum_min = sum_min
+        self.sum_max = sum_max
+        self.odd_min = odd_min
+        self.odd_max = odd_max
+        self.max_consecutive = max_consecutive
+        self.span_min = span_min
+        self.span_max = span_max
+
+    def validate(self):
+        """检查参数，返回错误信息，参数有效时返回 None"""
+        red_count, blue_count = self.lottery_type.red_count, self.lottery_type.blue_count
+        if not all(1 <= n <= red_count for n in self.pool):
+            return f'红球号码应在1-{red_count}之间'
+        if not all(1 <= n <= blue_count for n in self.blue_pool):
+            return f'蓝球号码应在1-{blue_count}之间'
+        if self.exclude & set(self.include):
+            return '胆码与杀号不能重复'
+        if len(self.include) > RED_PICK:
+            return '胆码不能超过6个'
+        if len(self.pool) < RED_PICK:
+            return '排除杀号后红球号码池不足6个'
+        return None
+
+    def _needs_enumeration(self):
+        """连号、跨度条件依赖号码的相对位置，无法用和值/奇偶计数直接统计"""
+        return self.max_consecutive is not None or self.span_min is not None or self.span_max is not None
+
+    def iter_red(self):
+        """按字典序逐个产出满足条件的红球组合（元组）"""
+        pool = self.pool
+        n = len(pool)
+        prefix = [0] + list(itertools.accumulate(pool))
+        odd_after = [0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            odd_after[i] = odd_after[i + 1] + (pool[i] & 1)
+        # 每个位置之后第一个胆码的下标（选号时不能越过胆码）及剩余胆码个数（必须留出位置）
+        required = set(self.include)
+        next_required = [n] * (n + 1)
+        required_after = [0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            next_required[i] = i if pool[i] in required else next_required[i + 1]
+            required_after[i] = required_after[i + 1] + (pool[i] in required)
+
+        sum_min, sum_max = self.sum_min, self.sum_max
+        odd_min, odd_max = self.odd_min, self.odd_max
+        even_min = RED_PICK - odd_max if odd_max is not None else None
+        even_max = RED_PICK - odd_min if odd_min is not None else None
+        span_min, span_max = self.span_min, self.span_max
+        max_run = self.max_consecutive
+        chosen = []
+
+        def search(start, total, odd, run):
+            remaining = RED_PICK - len(chosen)
+            if remaining == 0:
+                yield tuple(chosen)
+                return
+
+            picked = len(chosen) + 1
+            rest = remaining - 1
+            for i in range(start, min(n - remaining, next_required[start]) + 1):
+                number = pool[i]
+                first = chosen[0] if chosen else number
+                if required_after[i + 1] > rest:
+                    continue
+
+                # 跨度：号码递增，超出上限后后面的号码都不可能满足
+                if span_max is not None and number - first > span_max:
+                    break
+                if span_min is not None and pool[-1] - first < span_min:
+                    break
+
+                new_total = total + number
+                # 和值：剩余号码取最小的 rest 个仍超上限，则更大的号码也不可能满足
+                if sum_max is not None and new_total + prefix[i + 1 + rest] - prefix[i + 1] > sum_max:
+                    break
+                if sum_min is not None and new_total + prefix[n] - prefix[n - rest] < sum_min:
+                    continue
+
+                new_odd = odd + (number & 1)
+                new_even = picked - new_odd
+                odd_left = odd_after[i + 1]
+                even_left = (n - i - 1) - odd_left
+                if odd_max is not None and new_odd > odd_max:
+                    continue
+                if even_max is not None and new_even > even_max:
+                    continue
+                if odd_min is not None and new_odd + min(rest, odd_left) < odd_min:
+                    continue
+                if even_min is not None and new_even + min(rest, even_left) < even_min:
+                    continue
+
+                new_run = run + 1 if chosen and number == chosen[-1] + 1 else 1
+                if max_run is not None and new_run > max_run:
+                    continue
+
+                if rest == 0 and span_min is not None and number - first < span_min:
+                    continue
+
+                chosen.append(number)
+                yield from search(i + 1, new_total, new_odd, new_run)
+                chosen.pop()
+
+        yield from search(0, 0, 0, 0)
+
+    def iter_tickets(self):
+        """产出完整号码（红球组合 × 蓝球号码池）；未指定蓝球时 blue_ball 为 None"""
+        blues = self.blue_pool or [None]
+        for reds in self.iter_red():
+            for blue in blues:
+                yield {'red_balls': list(reds), 'blue_ball': blue}
+
+    def count_red(self):
+        """统计满足条件的红球组合数
+
+        没有连号、跨度条件时，按 (已选个数, 和值, 奇数个数) 做计数动态规划，不需要逐个枚举组合。
+        """
+        if self._needs_enumeration():
+            return sum(1 for _ in self.iter_red())
+
+        include = self.include
+        optional = [n for n in self.pool if n not in set(include)]
+        max_sum = sum(sorted(self.pool)[-RED_PICK:])
+        counts = np.zeros((RED_PICK + 1, max_sum + 1, RED_PICK + 1), dtype=np.int64)
+        counts[len(include), sum(include), sum(n & 1 for n in include)] = 1
+
+        for number in optional:
+            odd = number & 1
+            # 倒序遍历已选个数，保证每个号码只被选一次
+            for picked in range(RED_PICK - 1, len(include) - 1, -1):
+                layer = counts[picked, :max_sum + 1 - number, :RED_PICK + 1 - odd]
+                counts[picked + 1, number:, odd:] += layer
+
+        final = counts[RED_PICK]
+        sum_lo = self.sum_min if self.sum_min is not None else 0
+        sum_hi = self.sum_max if self.sum_max is not None else max_sum
+        odd_lo = self.odd_min if self.odd_min is not None else 0
+        odd_hi = self.odd_max if self.odd_max is not None else RED_PICK
+        return int(final[max(0, sum_lo):max(0, sum_hi + 1), max(0, odd_lo):max(0, odd_hi + 1)].sum())
+
+    def count_tickets(self):
+        return self.count_red() * max(1, len(self.blue_pool))
+
+    def unfiltered_count(self):
+        """号码池（含胆码）在不加过滤条件时的组合数，用于计算缩水比例"""
+        free = len(self.pool) - len(self.include)
+        return math.comb(free, RED_PICK - len(self.include)) * max(1, len(self.blue_pool))
@@ -0,0 +1,57 @@
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+
+# 共享缓存库在导入服务模块时打开，测试使用临时文件
+os.environ.setdefault('ANALYSIS_CACHE_PATH', os.path.join(tempfile.mkdtemp(), 'cache.db'))
+
+from flask import Flask
+from src.models.user import db
+from src.models.database import init_sqlite, sqlite_binds
+from src.routes.lottery import lottery_bp
+from src.services.analysis_cache import AnalysisCache
+from src.services.predictors import PredictorRegistry
+
+
+def make_draw(index, lottery_type=1):
+    """第 index 期的合成开奖数据（字段与 fetch_all_pages 返回的一致）"""
+    rng = random.Random(index)
+    reds = sorted(rng.sample(range(1, 34), 6))
+    blue = rng.randint(1, 16)
+    return {
+        'id': 1000 * lottery_type + index,
+        'type': lottery_type,
+        'type_name': '双色球',
+        'issue_number': f'2024{index:03d}',
+        'lottery_date': (date(2024, 1, 2) + timedelta(days=index * 3)).strftime('%Y-%m-%d'),
+        'week': '二',
+        'win_code': ','.join(f'{n:02d}' for n in reds) + f',{blue:02d}'
+    }
+
+
+@pytest.fixture()
+def app(tmp_path):
+    """使用临时数据库的应用，注册彩票路由"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'app.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_BINDS'] = sqlite_binds(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.register_blueprint(lottery_bp, url_prefix='/api/lottery')
+    db.init_app(app)
+    init_sqlite(app, db)
+    AnalysisCache.clear()
+    PredictorRegistry._states.clear()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+    AnalysisCache.clear()
+    PredictorRegistry._states.clear()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from conftest import make_draw
+from src.models.lottery import LotteryResult, MarkovTransitionState, DrawFeature
+from src.models.user import db
+from src.models.database import add_missing_columns, rebuild_changed_tables
+from src.services.feature_store import FeatureStore
+
+# 分彩种之前的开奖表：期号全局唯一
+OLD_LOTTERY_RESULTS = """
+CREATE TABLE lottery_results (
+    id INTEGER NOT NULL PRIMARY KEY,
+    original_id INTEGER NOT NULL UNIQUE,
+    type INTEGER NOT NULL,
+    type_name VARCHAR(50) NOT NULL,
+    issue_number VARCHAR(20) NOT NULL UNIQUE,
+    lottery_date DATE NOT NULL,
+    week VARCHAR(10) NOT NULL,
+    win_code VARCHAR(100) NOT NULL,
+    red_balls VARCHAR(50) NOT NULL,
+    blue_ball INTEGER NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME
+)
+"""
+
+
+@pytest.fixture()
+def old_schema(app):
+    db.drop_all()
+    with db.engine.begin() as connection:
+        connection.execute(text(OLD_LOTTERY_RESULTS))
+        for index in range(1, 11):
+            draw = make_draw(index)
+            reds, blue = draw['win_code'].rsplit(',', 1)
+            connection.execute(text(
+                'INSERT INTO lottery_results (original_id, type, type_name, issue_number, lottery_date, '
+                'week, win_code, red_balls, blue_ball, created_at, updated_at) VALUES '
+                '(:id, :type, :type_name, :issue_number, :lottery_date, :week, :win_code, :reds, :blue, '
+                'CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)'
+            ), dict(draw, reds=reds, blue=int(blue)))
+    db.create_all()
+    FeatureStore.sync_features(1)
+    return app
+
+
+def _unique_sets(table_name):
+    return {
+        tuple(sorted(constraint['column_names']))
+        for constraint in inspect(db.engine).get_unique_constraints(table_name)
+    }
+
+
+def _result_fields(draw):
+    red_balls, blue_ball = LotteryResult.parse_win_code(draw['win_code'])
+    return {
+        'original_id': draw['id'],
+        'type': draw['type'],
+        'type_name': draw['type_name'],
+        'issue_number': draw['issue_number'],
+        'lottery_date': datetime.strptime(draw['lottery_date'], '%Y-%m-%d').date(),
+        'week': draw['week'],
+        'win_code': draw['win_code'],
+        'red_balls': red_balls,
+        'blue_ball': blue_ball
+    }
+
+
+def test_rebuild_changed_tables_preserves_rows_and_constraints(old_schema):
+    before = db.session.execute(text('SELECT * FROM lottery_results ORDER BY id')).all()
+    db.session.close()
+
+    add_missing_columns(db, LotteryResult, MarkovTransitionState, DrawFeature)
+    assert rebuild_changed_tables(db, LotteryResult, MarkovTransitionState) == ['lottery_results']
+
+    after = db.session.execute(text('SELECT * FROM lottery_results ORDER BY id')).all()
+    assert [tuple(row) for row in after] == [tuple(row) for row in before]
+    assert _unique_sets('lottery_results') == {('original_id',), ('issue_number', 'type')}
+    index_names = {index['name'] for index in inspect(db.engine).get_indexes('lottery_results')}
+    assert 'ix_lottery_results_type_date' in index_names
+
+    # 引用开奖表的外键仍指向新表，旧表已删除
+    tables = inspect(db.engine).get_table_names()
+    assert 'lottery_results_old' not in tables
+    assert db.session.execute(text('PRAGMA foreign_key_check')).all() == []
+    referred = {fk['referred_table'] for fk in inspect(db.engine).get_foreign_keys('draw_features')}
+    assert referred == {'lottery_results'}
+    assert DrawFeature.query.count() == len(before)
+
+    # 期号只在彩种内唯一
+    db.session.add(LotteryResult(**_result_fields(make_draw(1, lottery_type=2))))
+    db.session.commit()
+    db.session.add(LotteryResult(**dict(_result_fields(make_draw(1)), original_id=99999)))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+    # 约束已与模型一致时不再重建
+    assert rebuild_changed_tables(db, LotteryResult, MarkovTransitionState) == []
+
@@ -0,0 +1,21 @@
+import logging
+
+import pytest
+
+from src.services.decayed_frequency import DEFAULT_HALF_LIVES, parse_half_lives
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('', DEFAULT_HALF_LIVES),
+    ('5', (5,)),
+    ('10, 50,200', (10, 50, 200)),
+])
+def test_parse_half_lives(value, expected):
+    assert parse_half_lives(value) == expected
+
+
+@pytest.mark.parametrize('value', ['0', '10,-5', 'abc', '10,1.5'])
+def test_parse_half_lives_falls_back_on_invalid_values(value, caplog):
+    with caplog.at_level(logging.WARNING, logger='src.services.decayed_frequency'):
+        assert parse_half_lives(value) == DEFAULT_HALF_LIVES
+    assert '半衰期配置无效' in caplog.text
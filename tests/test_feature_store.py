@@ -0,0 +1,53 @@
+from datetime import date
+
+import pytest
+
+from conftest import make_draw
+from src.models.lottery import DrawFeature
+from src.services.feature_store import FeatureStore, compute_draw_features
+from src.services.lottery_service import LotteryService
+
+
+@pytest.fixture()
+def draws(app):
+    draws = [make_draw(i) for i in range(1, 11)]
+    LotteryService.save_lottery_results(draws)
+    assert FeatureStore.sync_features(1) == 10
+    return draws
+
+
+def test_sync_features_is_incremental(draws):
+    assert FeatureStore.sync_features(1) == 0
+
+
+def test_sync_features_resyncs_changed_blue_ball(draws):
+    draw = dict(draws[2])
+    reds, blue = draw['win_code'].rsplit(',', 1)
+    new_blue = int(blue) % 16 + 1
+    draw['win_code'] = f'{reds},{new_blue:02d}'
+    LotteryService.save_lottery_results([draw])
+
+    assert FeatureStore.sync_features(1) == 1
+    found = FeatureStore.search({'blue_ball': (new_blue, new_blue)}).items
+    assert draw['issue_number'] in [feature.result.issue_number for feature in found]
+    assert all(feature.blue_ball == feature.result.blue_ball for feature in found)
+
+
+def test_sync_features_resyncs_changed_date(draws):
+    draw = dict(draws[4], lottery_date='2030-01-01')
+    LotteryService.save_lottery_results([draw])
+
+    assert FeatureStore.sync_features(1) == 1
+    found = FeatureStore.search({}, start_date=date(2030, 1, 1)).items
+    assert [feature.result.issue_number for feature in found] == [draw['issue_number']]
+
+
+def test_sync_features_recomputes_changed_reds(draws):
+    draw = dict(draws[0], win_code='01,02,03,04,05,06,07')
+    LotteryService.save_lottery_results([draw])
+
+    assert FeatureStore.sync_features(1) == 1
+    expected = compute_draw_features([[1, 2, 3, 4, 5, 6]])
+    found = FeatureStore.search({'red_sum': (21, 21)}).items
+    assert [feature.result.issue_number for feature in found] == [draw['issue_number']]
+    assert found[0].consecutive_pairs == int(expected['consecutive_pairs'][0])
@@ -0,0 +1,22 @@
+import pytest
+
+from src.services.lottery_types import parse_lottery_types
+
+
+def test_parse_lottery_types_keeps_configured_order():
+    types = parse_lottery_types('1:双色球:33:16, 2: 其他彩种 :35:12,')
+    assert list(types) == [1, 2]
+    assert types[2].name == '其他彩种'
+    assert types[2].ball_sizes == {'red': 35, 'blue': 12}
+    assert types[1].zone_bounds == (11, 22)
+    assert types[1].big_threshold == 17
+
+
+def test_parse_lottery_types_empty_value():
+    assert parse_lottery_types('') == {}
+
+
+@pytest.mark.parametrize('value', ['1:双色球:6:16', '1:双色球:65:16', '1:双色球:33:0', '1:双色球:33', 'x:双色球:33:16'])
+def test_parse_lottery_types_rejects_invalid_entries(value):
+    with pytest.raises(ValueError):
+        parse_lottery_types(value)
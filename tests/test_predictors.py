@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from conftest import make_draw
+from src.models.lottery import LotteryResult, MarkovTransitionState
+from src.services.decayed_frequency import DecayedFrequencyService
+from src.services.ingest import IngestService
+from src.services.lottery_service import LotteryService
+from src.services.markov import MarkovService
+from src.services.predictors import (
+    PredictorRegistry, build_frequency_state, build_decayed_frequency_state
+)
+
+
+@pytest.fixture()
+def history(app):
+    LotteryService.save_lottery_results([make_draw(i) for i in range(1, 31)])
+    LotteryService.update_number_frequency(1)
+    DecayedFrequencyService.sync_scores(lottery_type=1)
+    PredictorRegistry._states.clear()
+    return app
+
+
+def test_state_read_between_ingest_commits_is_not_cached_under_new_version(history, monkeypatch):
+    """入库时开奖记录先提交、频率统计后提交，两次提交之间的预测不应把旧统计缓存在新版本下"""
+    PredictorRegistry.get_state('frequency')
+    PredictorRegistry.get_state('decayed_frequency')
+
+    update_number_frequency = LotteryService.update_number_frequency
+    interleaved = {}
+
+    def predict_then_update(lottery_type):
+        # 此时新开奖已提交，NumberFrequency 和衰减得分尚未更新
+        assert LotteryResult.query.count() == 31
+        interleaved['prediction'] = PredictorRegistry.predict('combined', lottery_type)
+        interleaved['decayed'] = PredictorRegistry.predict('decayed', lottery_type)
+        return update_number_frequency(lottery_type)
+
+    monkeypatch.setattr(LotteryService, 'fetch_all_pages', staticmethod(lambda type_id, max_pages: [make_draw(31)]))
+    monkeypatch.setattr(LotteryService, 'update_number_frequency', staticmethod(predict_then_update))
+
+    result = IngestService.run(max_pages=1, lottery_types=[1])
+
+    assert result['new_issues'] == ['2024031']
+    assert interleaved['prediction'] and interleaved['decayed']
+    assert PredictorRegistry.get_state('frequency') == build_frequency_state(1)
+    decayed = PredictorRegistry.get_state('decayed_frequency')
+    expected = build_decayed_frequency_state(1)
+    for ball_type in ('red', 'blue'):
+        assert (decayed[ball_type] == expected[ball_type]).all()
+
+
+def test_markov_state_update_applies_new_draws_without_writing(history):
+    """新开奖在内存中计入转移矩阵副本，不修改旧状态，也不写入持久化的矩阵"""
+    state = PredictorRegistry.get_state('markov')
+    assert state['red'].last_issue == '2024030'
+
+    LotteryService.save_lottery_results([make_draw(31), make_draw(32)])
+    updated = PredictorRegistry.get_state('markov')
+
+    assert PredictorRegistry._states[(1, 'markov')]['mode'] == 'update'
+    assert state['red'].last_issue == '2024030'
+    assert updated['red'].last_issue == '2024032'
+    stored = MarkovTransitionState.query.filter_by(lottery_type=1, ball_type='red').one()
+    assert stored.last_issue == '2024030'
+
+    rebuilt = MarkovService.rebuild_state(1)
+    for ball_type in ('red', 'blue'):
+        assert np.array_equal(updated[ball_type].counts, rebuilt[ball_type].counts)
+        assert np.array_equal(updated[ball_type].totals, rebuilt[ball_type].totals)
+        assert updated[ball_type].transitions == rebuilt[ball_type].transitions
+        assert updated[ball_type].last_numbers == rebuilt[ball_type].last_numbers
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from conftest import make_draw
+from src.services.lottery_service import LotteryService
+from src.services.lottery_types import LOTTERY_TYPES, LotteryType
+from src.services.ticket_checker import parse_ticket
+
+
+@pytest.mark.parametrize('text', [
+    '01,02,03,04,05,06,07',
+    '01 02 03 04 05 06 + 07',
+    '06，05；04|03 02 01 07',
+])
+def test_parse_ticket_accepts_common_separators(text):
+    assert parse_ticket(text) == ([1, 2, 3, 4, 5, 6], 7)
+
+
+@pytest.mark.parametrize('text', [
+    '1,2,3,4,5,x,7',        # 红球含非数字
+    '1,2,3,4,5,6,x',        # 蓝球含非数字
+    '1,2,3,4,5,6',          # 个数不足
+    '1,2,3,4,5,6,7,8',      # 个数过多
+    '1,1,3,4,5,6,7',        # 红球重复
+    '0,2,3,4,5,6,7',        # 红球越界
+    '1,2,3,4,5,34,7',
+    '1,2,3,4,5,6,17',       # 蓝球越界
+    '1,2,3,4,5,6,0',
+    '',
+    None,
+])
+def test_parse_ticket_rejects_malformed_tickets(text):
+    assert parse_ticket(text) is None
+
+
+def test_parse_ticket_uses_lottery_type_ranges(monkeypatch):
+    monkeypatch.setitem(LOTTERY_TYPES, 2, LotteryType(2, '测试彩种', 35, 12))
+    assert parse_ticket('1,2,3,4,5,35,12', 2) == ([1, 2, 3, 4, 5, 35], 12)
+    assert parse_ticket('1,2,3,4,5,35,12', 1) is None
+    assert parse_ticket('1,2,3,4,5,6,16', 2) is None
+
+
+@pytest.fixture()
+def draws(app):
+    LotteryService.save_lottery_results([make_draw(i) for i in range(1, 11)])
+    return [make_draw(i) for i in range(1, 11)]
+
+
+def test_check_tickets_accepts_list_body(client, draws):
+    winning = draws[0]['win_code']
+    response = client.post('/api/lottery/check-tickets', json=[winning, '1,2,3,4,5,x,7'])
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['code'] == 1
+    summary = body['data']['summary']
+    assert summary['valid_tickets'] == 1
+    assert summary['invalid_tickets'] == [{'index': 1, 'ticket': '1,2,3,4,5,x,7'}]
+    assert summary['draws_evaluated'] == 10
+    assert body['data']['results'][0]['tiers']['一等奖'] >= 1
+
+
+def test_check_tickets_accepts_plain_text_body(client, draws):
+    text = '\n'.join(draw['win_code'] for draw in draws[:3])
+    response = client.post('/api/lottery/check-tickets', data=text, content_type='text/plain')
+    body = response.get_json()
+    assert body['code'] == 1
+    assert body['data']['summary']['valid_tickets'] == 3
+
+
+@pytest.mark.parametrize('payload', ['"01,02,03,04,05,06,07"', '42', '{"tickets": "01,02,03,04,05,06,07"}'])
+def test_check_tickets_rejects_non_object_bodies(client, draws, payload):
+    response = client.post('/api/lottery/check-tickets', data=payload, content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 0
+
+
+def test_check_tickets_string_stream_flag(client, draws):
+    tickets = [draws[0]['win_code']]
+    response = client.post('/api/lottery/check-tickets', json={'tickets': tickets, 'stream': 'false'})
+    assert response.mimetype == 'application/json'
+
+    response = client.post('/api/lottery/check-tickets', json={'tickets': tickets, 'stream': 'true'})
+    assert response.mimetype == 'application/x-ndjson'
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [event['type'] for event in events] == ['start', 'ticket', 'end']
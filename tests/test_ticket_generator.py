@@ -0,0 +1,86 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from src.services.ticket_generator import TicketGenerator
+
+
+def _max_run(reds):
+    run = best = 1
+    for a, b in zip(reds, reds[1:]):
+        run = run + 1 if b == a + 1 else 1
+        best = max(best, run)
+    return best
+
+
+def brute_force(red_pool, sum_min=None, sum_max=None, odd_min=None, odd_max=None,
+                max_consecutive=None, span_min=None, span_max=None, include=(), exclude=()):
+    """逐个枚举 C(n,6) 后按条件过滤，作为对照"""
+    pool = sorted((set(red_pool) | set(include)) - set(exclude))
+    result = []
+    for reds in itertools.combinations(pool, 6):
+        total, odd, span = sum(reds), sum(n & 1 for n in reds), reds[-1] - reds[0]
+        if not set(include) <= set(reds):
+            continue
+        if sum_min is not None and total < sum_min or sum_max is not None and total > sum_max:
+            continue
+        if odd_min is not None and odd < odd_min or odd_max is not None and odd > odd_max:
+            continue
+        if span_min is not None and span < span_min or span_max is not None and span > span_max:
+            continue
+        if max_consecutive is not None and _max_run(reds) > max_consecutive:
+            continue
+        result.append(reds)
+    return result
+
+
+def _random_conditions(seed, positional):
+    rng = random.Random(seed)
+    pool = rng.sample(range(1, 34), rng.randint(6, 16))
+    conditions = {'red_pool': pool}
+    if rng.random() < 0.7:
+        low = rng.randint(21, 120)
+        conditions['sum_min'], conditions['sum_max'] = low, low + rng.randint(0, 60)
+    if rng.random() < 0.7:
+        low = rng.randint(0, 4)
+        conditions['odd_min'], conditions['odd_max'] = low, low + rng.randint(0, 2)
+    include = rng.sample(pool, rng.randint(0, 2))
+    conditions['include'] = include
+    conditions['exclude'] = rng.sample([n for n in range(1, 34) if n not in include], rng.randint(0, 3))
+    if positional:
+        conditions['max_consecutive'] = rng.choice([None, 1, 2, 3])
+        conditions['span_min'] = rng.choice([None, 10, 20])
+        conditions['span_max'] = rng.choice([None, 25, 32])
+    return conditions
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_count_red_matches_brute_force(seed):
+    """无连号、跨度条件时走计数动态规划，结果应与逐个枚举一致"""
+    conditions = _random_conditions(seed, positional=False)
+    generator = TicketGenerator(**conditions)
+    if generator.validate():
+        pytest.skip(generator.validate())
+    assert not generator._needs_enumeration()
+    assert generator.count_red() == len(brute_force(**conditions))
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_iter_red_matches_brute_force(seed):
+    """剪枝后的深度优先枚举应按字典序产出与逐个枚举相同的组合"""
+    conditions = _random_conditions(seed, positional=True)
+    generator = TicketGenerator(**conditions)
+    if generator.validate():
+        pytest.skip(generator.validate())
+    expected = brute_force(**conditions)
+    assert list(generator.iter_red()) == expected
+    assert generator.count_red() == len(expected)
+
+
+def test_unfiltered_count_and_tickets():
+    generator = TicketGenerator(range(1, 11), blue_pool=[1, 2, 3], include=[5])
+    assert generator.unfiltered_count() == math.comb(9, 5) * 3
+    assert generator.count_tickets() == generator.unfiltered_count()
+    assert sum(1 for _ in generator.iter_tickets()) == generator.count_tickets()